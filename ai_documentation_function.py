@@ -8,8 +8,21 @@ import subprocess
 import tempfile
 import shutil
 from datetime import datetime
-import git
-from aisystemdoc.doc_generator import generate_docs
+
+# GitPython and the doc generator are heavy and optional; they are imported on
+# first use so importing this module stays cheap and never fails.
+git = None
+generate_docs = None
+
+def _load_dependencies():
+    """Import GitPython and the doc generator once, on first use."""
+    global git, generate_docs
+    if git is None:
+        import git as git_module
+        git = git_module
+    if generate_docs is None:
+        from aisystemdoc.doc_generator import generate_docs as generate_docs_function
+        generate_docs = generate_docs_function
 
 def generate_ai_documentation(repo_url: str, repo_name: str = None) -> dict:
     """
@@ -30,6 +43,15 @@ def generate_ai_documentation(repo_url: str, repo_name: str = None) -> dict:
         print(f"🚀 Starting AI documentation generation for: {repo_name}")
         print(f"📥 Repository URL: {repo_url}")
         
+        try:
+            _load_dependencies()
+        except ImportError as e:
+            return {
+                "status": "error",
+                "message": f"Missing dependency: {str(e)}",
+                "repo_name": repo_name
+            }
+        
         # Create temporary directory for cloning
         with tempfile.TemporaryDirectory() as temp_dir:
             temp_repo_path = os.path.join(temp_dir, repo_name)
@@ -0,0 +1,205 @@
+"""
+AI Insight Engine - Concurrent Insight Generation for Code Analysis Results
+This module sends repository- and directory-level prompts to a generative model
+concurrently, with bounded parallelism, per-call deadlines and clean fallbacks.
+"""
+
+import json
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+REPOSITORY_PROMPT = """
+Analyze this code repository summary and provide insights:
+
+{summary}
+
+Provide insights on:
+1. Code quality assessment
+2. Security recommendations
+3. Performance suggestions
+4. Documentation improvements
+5. Best practices recommendations
+
+Respond with JSON format.
+"""
+
+DIRECTORY_PROMPT = """
+Analyze this summary of the `{directory}` directory of a code repository:
+
+{summary}
+
+Give concise code quality, security and documentation recommendations
+specific to this directory. Respond with JSON format.
+"""
+
+class InsightEngine:
+    """
+    Generates AI insights for analysis results using one shared model client.
+    
+    Any object with a generate_content(prompt) method returning an object with
+    a .text attribute can be used as the model, which makes a local stub a
+    drop-in replacement for Gemini. Models that also provide
+    generate_content_async are awaited directly; otherwise blocking calls run
+    on the engine's own thread pool. A call that misses its deadline is
+    abandoned and reported as a timeout. The pool it ran on is retired and
+    later calls get a fresh one, so an abandoned call finishing in the
+    background never holds up other prompts. Abandoned calls keep their
+    threads until the model returns, so at most max_abandoned_calls may be
+    outstanding; beyond that blocking calls fail fast instead of starting
+    threads, keeping live threads under max_concurrency + max_abandoned_calls.
+    """
+    
+    def __init__(self, model: Any = None, api_key: str = None, model_name: str = "gemini-2.5-flash",
+                 max_concurrency: int = 4, call_timeout: float = 30.0,
+                 deadline: Optional[float] = 120.0, max_directories: int = 20,
+                 max_abandoned_calls: int = 8):
+        self.model = model
+        self.api_key = api_key
+        self.model_name = model_name
+        self.max_concurrency = max_concurrency
+        self.call_timeout = call_timeout
+        self.deadline = deadline
+        self.max_directories = max_directories
+        self.max_abandoned_calls = max_abandoned_calls
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._abandoned = 0
+        self._abandoned_lock = threading.Lock()
+    
+    def _get_model(self) -> Any:
+        """Create the Gemini client on first use and reuse it afterwards."""
+        if self.model is None:
+            import google.generativeai as genai
+            genai.configure(api_key=self.api_key)
+            self.model = genai.GenerativeModel(self.model_name)
+        return self.model
+    
+    def generate(self, results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Synchronous wrapper around generate_async.
+        
+        When called from inside a running event loop (e.g. a webhook handler
+        running an analysis) the prompts run on a helper thread with its own
+        loop; the caller still blocks, so prefer awaiting generate_async there.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.generate_async(results))
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='insights-loop') as runner:
+            return runner.submit(asyncio.run, self.generate_async(results)).result()
+    
+    async def generate_async(self, results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Generate repository and per-directory insights concurrently.
+        
+        Args:
+            results: Analysis results from SmartCodeAnalyzer
+        
+        Returns:
+            Insights dictionary, or None if the repository-level prompt failed
+        """
+        try:
+            model = self._get_model()
+        except Exception as e:
+            print(f"⚠️ AI insights generation failed: {str(e)}")
+            return None
+        
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        expires_at = time.monotonic() + self.deadline if self.deadline else None
+        
+        directories = self._select_directories(results)
+        prompts = [REPOSITORY_PROMPT.format(summary=json.dumps(self._repository_summary(results), indent=2))]
+        prompts.extend(
+            DIRECTORY_PROMPT.format(directory=directory, summary=json.dumps(stats, indent=2))
+            for directory, stats in directories
+        )
+        
+        outcomes = await asyncio.gather(*(self._call(model, prompt, semaphore, expires_at) for prompt in prompts))
+        
+        repository_outcome = outcomes[0]
+        if repository_outcome['status'] != 'success':
+            print(f"⚠️ AI insights generation failed: {repository_outcome['error']}")
+            return None
+        
+        return {
+            'ai_insights': repository_outcome['text'],
+            'directory_insights': {
+                directory: outcome for (directory, _), outcome in zip(directories, outcomes[1:])
+            },
+            'generated_at': datetime.now().isoformat()
+        }
+    
+    async def _call(self, model: Any, prompt: str, semaphore: asyncio.Semaphore,
+                    expires_at: Optional[float]) -> Dict[str, Any]:
+        """Run one prompt under the concurrency limit and deadline."""
+        async with semaphore:
+            timeout = self.call_timeout
+            if expires_at is not None:
+                timeout = min(timeout, expires_at - time.monotonic())
+                if timeout <= 0:
+                    return {'status': 'timeout', 'text': None, 'error': 'Overall deadline exceeded'}
+            
+            executor = None
+            future = None
+            try:
+                if hasattr(model, 'generate_content_async'):
+                    call = model.generate_content_async(prompt)
+                else:
+                    if self._abandoned >= self.max_abandoned_calls:
+                        return {'status': 'error', 'text': None,
+                                'error': f"{self._abandoned} abandoned model calls still running"}
+                    if self._executor is None:
+                        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                                            thread_name_prefix='insights')
+                    executor = self._executor
+                    future = executor.submit(model.generate_content, prompt)
+                    call = asyncio.wrap_future(future)
+                response = await asyncio.wait_for(call, timeout)
+                return {'status': 'success', 'text': response.text, 'error': None}
+            except asyncio.TimeoutError:
+                if executor is not None:
+                    self._abandon(future)
+                    self._retire_executor(executor)
+                return {'status': 'timeout', 'text': None, 'error': f"No response within {timeout:.1f}s"}
+            except Exception as e:
+                return {'status': 'error', 'text': None, 'error': str(e)}
+    
+    def _abandon(self, future: Any):
+        """Count a timed-out call against max_abandoned_calls until its thread finishes."""
+        with self._abandoned_lock:
+            self._abandoned += 1
+        future.add_done_callback(self._release_abandoned)
+    
+    def _release_abandoned(self, future: Any):
+        """Done callback for an abandoned call; runs on the pool thread."""
+        with self._abandoned_lock:
+            self._abandoned -= 1
+    
+    def _retire_executor(self, executor: ThreadPoolExecutor):
+        """Stop routing calls to a pool whose thread is stuck on an abandoned call."""
+        if self._executor is executor:
+            self._executor = None
+            print(f"⚠️ Model call timed out; retiring its thread pool "
+                  f"({self._abandoned} abandoned call(s) still running)")
+        # Running calls, including the abandoned one, still finish in the background
+        executor.shutdown(wait=False)
+    
+    def _repository_summary(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Repository-level summary sent with the main prompt."""
+        return {
+            'total_files': results['files_analyzed'],
+            'file_types': results['file_types'],
+            'total_functions': len(results['functions']),
+            'total_classes': len(results['classes']),
+            'security_issues_count': len(results['security_issues'])
+        }
+    
+    def _select_directories(self, results: Dict[str, Any]) -> List[tuple]:
+        """Largest directories by file count, capped at max_directories."""
+        directories = results.get('directories', {})
+        ranked = sorted(directories.items(), key=lambda item: (-item[1]['files'], item[0]))
+        return ranked[:self.max_directories]
@@ -0,0 +1,205 @@
+"""
+Analysis Watcher - Watch-Mode Incremental Analysis for SmartCodeAnalyzer
+This module keeps per-file analysis results for a repository in memory and
+re-analyzes only the files that change, so editors and dashboards can read an
+up-to-date report at any time without a cold scan.
+"""
+
+import os
+import time
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Callable
+
+from smart_analyzer import SmartCodeAnalyzer, RunningSummary
+
+class AnalysisWatcher:
+    """
+    Polls a repository tree and keeps its analysis current.
+    
+    Change detection compares (mtime, size) snapshots taken with the
+    analyzer's own walker, so exclusions and .gitignore rules apply and no
+    platform-specific notification API is needed. A burst of saves is
+    debounced: once a change is seen the tree is re-scanned every `debounce`
+    seconds until it stops changing (or `max_debounce` passes), and the whole
+    burst is then analyzed in one batch.
+    
+    Each poll walks the tree and stats every code file, so it costs O(N)
+    system calls for N files even when nothing changed. Directory mtimes
+    cannot narrow this down: editing a file in place leaves its directory's
+    mtime untouched. On very large trees raise poll_interval, or narrow the
+    tree with the analyzer's exclude_patterns.
+    
+    The report is rebuilt once per batch and swapped in as a whole, so
+    current_report() is a constant-time read that is safe to call from other
+    threads while the watcher runs. Per-file state is only changed under a
+    lock, which file_result() and full_results() also take.
+    """
+    
+    def __init__(self, analyzer: SmartCodeAnalyzer, repo_path: str, poll_interval: float = 1.0,
+                 debounce: float = 0.3, max_debounce: float = 5.0, workers: Optional[int] = 1,
+                 on_update: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.analyzer = analyzer
+        self.repo_path = repo_path
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.max_debounce = max_debounce
+        self.workers = workers
+        self.on_update = on_update
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.snapshot: Dict[str, tuple] = {}
+        self.summary = RunningSummary()
+        self.generation = 0
+        self._report: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def current_report(self) -> Optional[Dict[str, Any]]:
+        """The latest report (None before the initial scan completes)."""
+        return self._report
+    
+    def file_result(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """The current analysis of one file, by the path the walker reports."""
+        with self._lock:
+            return self.files.get(file_path)
+    
+    def scan(self) -> Dict[str, tuple]:
+        """Stat every code file in the tree (one stat per file); {path: (mtime_ns, size)}."""
+        snapshot = {}
+        for file_path in self.analyzer._find_code_files(self.repo_path):
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            snapshot[file_path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+    
+    def refresh(self) -> Dict[str, List[str]]:
+        """
+        Poll once; if anything changed, wait for the burst to settle and apply it.
+        
+        Returns:
+            {'changed': [...], 'removed': [...]} paths applied in this call
+        """
+        snapshot = self.scan()
+        if snapshot == self.snapshot:
+            return {'changed': [], 'removed': []}
+        
+        settle_until = time.monotonic() + self.max_debounce
+        while time.monotonic() < settle_until:
+            if self._stop.wait(self.debounce):
+                break
+            latest = self.scan()
+            if latest == snapshot:
+                break
+            snapshot = latest
+        
+        changed = [path for path, stat in snapshot.items() if self.snapshot.get(path) != stat]
+        removed = [path for path in self.snapshot if path not in snapshot]
+        self._apply(snapshot, changed, removed)
+        return {'changed': changed, 'removed': removed}
+    
+    def _apply(self, snapshot: Dict[str, tuple], changed: List[str], removed: List[str]):
+        """Re-analyze changed files, drop removed ones and publish a new report."""
+        # Analyze before taking the lock so readers are only blocked for the swap
+        analyses = list(self.analyzer._iter_file_analyses(changed, self.workers)) if changed else []
+        if self.analyzer.cache:
+            self.analyzer.cache.save()
+        
+        with self._lock:
+            # The snapshot is taken before analysis, so an edit made mid-analysis
+            # shows up as a change on the next poll
+            self.snapshot = snapshot
+            
+            for file_path in removed:
+                previous = self.files.pop(file_path, None)
+                if previous:
+                    self.summary.remove(previous)
+            
+            for file_path, file_analysis in zip(changed, analyses):
+                previous = self.files.pop(file_path, None)
+                if previous:
+                    self.summary.remove(previous)
+                if file_analysis:
+                    self.files[file_path] = file_analysis
+                    self.summary.add(file_analysis)
+            
+            self.summary.total_files = len(snapshot)
+            self.generation += 1
+            summary = self.summary.as_dict()
+            files_analyzed = self.summary.files_analyzed
+            file_types = dict(self.summary.file_types)
+        
+        self._report = {
+            'repository_path': self.repo_path,
+            'generation': self.generation,
+            'updated_at': datetime.now().isoformat(),
+            'total_files': len(snapshot),
+            'files_analyzed': files_analyzed,
+            'file_types': file_types,
+            'summary': summary,
+            'last_changes': {
+                'changed': [os.path.relpath(path) for path in changed],
+                'removed': [os.path.relpath(path) for path in removed]
+            }
+        }
+        if self.on_update:
+            self.on_update(self._report)
+    
+    def full_results(self) -> Dict[str, Any]:
+        """
+        Materialize the analyze_repository-style results from the in-memory state.
+        
+        Unlike current_report() this is linear in the number of files; use it
+        for a full generate_analysis_report(). The state is copied under the
+        lock, so a batch applied meanwhile cannot change it mid-iteration.
+        """
+        with self._lock:
+            files = dict(self.files)
+            total_files = len(self.snapshot)
+        results = self.analyzer._new_results(self.repo_path)
+        results['total_files'] = total_files
+        for file_path in sorted(files):
+            self.analyzer._merge_file_analysis(results, files[file_path])
+            results['files_analyzed'] += 1
+        results['summary'] = self.analyzer._calculate_summary_metrics(results)
+        return results
+    
+    def run(self):
+        """Analyze the tree, then keep polling until stop() is called."""
+        self._stop.clear()
+        if self._report is None:
+            snapshot = self.scan()
+            self._apply(snapshot, list(snapshot), [])
+        while not self._stop.wait(self.poll_interval):
+            self.refresh()
+    
+    def start(self) -> 'AnalysisWatcher':
+        """Run the watcher on a background daemon thread."""
+        self._thread = threading.Thread(target=self.run, name='analysis-watcher', daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self, timeout: Optional[float] = None):
+        """Stop polling and wait for the background thread to finish."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+if __name__ == "__main__":
+    import sys
+    
+    def print_update(report: Dict[str, Any]):
+        changes = report['last_changes']
+        summary = report['summary']
+        print(f"🔄 [{report['generation']}] {len(changes['changed'])} changed, {len(changes['removed'])} removed - "
+              f"{summary['total_functions_found']} functions, {summary['total_security_issues']} security issues")
+    
+    repo_path = sys.argv[1] if len(sys.argv) > 1 else "."
+    print(f"👀 Watching {repo_path} (Ctrl+C to stop)")
+    try:
+        AnalysisWatcher(SmartCodeAnalyzer(), repo_path, on_update=print_update).run()
+    except KeyboardInterrupt:
+        print("👋 Stopped")
@@ -0,0 +1,313 @@
+"""
+Smart Analyzer Benchmark Suite
+Generates synthetic repositories and times each SmartCodeAnalyzer stage.
+
+Results are written as JSON so runs from different commits can be compared:
+    
+    python benchmark_analyzer.py --output bench.json
+    python benchmark_analyzer.py --baseline bench.json --threshold 0.2
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import contextlib
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Dict, List, Any, Callable, Optional
+
+from smart_analyzer import SmartCodeAnalyzer, ANALYZER_VERSION
+
+@dataclass
+class BenchmarkConfig:
+    """Size and language mix of the synthetic repository"""
+    python_files: int = 40
+    python_nesting_depth: int = 12
+    python_functions_per_file: int = 60
+    js_files: int = 4
+    js_size_kb: int = 512
+    java_files: int = 10
+    java_methods_per_file: int = 200
+    html_files: int = 10
+    html_forms_per_file: int = 100
+    seed: int = 42
+    workers: int = 4
+    repeat: int = 3
+
+def _python_source(rng: random.Random, config: BenchmarkConfig, index: int) -> str:
+    """Python module with flat functions, classes and one deeply nested function."""
+    lines = ['"""Synthetic module %d."""' % index, 'import os', 'from typing import List', '']
+    for i in range(config.python_functions_per_file):
+        lines.append(f"def func_{index}_{i}(a, b, c={i}):")
+        lines.append(f'    """Function {i} docstring for the format/diff keywords."""')
+        lines.append(f"    for item in range(a):")
+        lines.append(f"        if item % {rng.randint(2, 9)} == 0:")
+        lines.append(f"            b += item  # accumulate")
+        lines.append(f"    return b + c")
+        lines.append("")
+    
+    lines.append(f"class Service{index}(object):")
+    lines.append('    """Synthetic service class."""')
+    for i in range(config.python_functions_per_file // 4):
+        lines.append(f"    def method_{i}(self, value):")
+        lines.append(f"        try:")
+        lines.append(f"            return eval(value) if value else None")
+        lines.append(f"        except ValueError:")
+        lines.append(f"            return None")
+        lines.append("")
+    
+    # Deeply nested functions stress per-function traversal
+    indent = ''
+    for depth in range(config.python_nesting_depth):
+        lines.append(f"{indent}def nested_{index}_{depth}(x):")
+        lines.append(f"{indent}    while x > {depth}:")
+        lines.append(f"{indent}        x -= 1")
+        indent += '    '
+    lines.append(f"{indent}return x")
+    return "\n".join(lines) + "\n"
+
+def _minified_js_source(rng: random.Random, config: BenchmarkConfig, index: int) -> str:
+    """Single-line bundle of roughly js_size_kb kilobytes."""
+    parts = []
+    size = 0
+    i = 0
+    target = config.js_size_kb * 1024
+    while size < target:
+        choice = rng.randrange(4)
+        if choice == 0:
+            part = f"function f{index}_{i}(a,b){{if(a>b){{return a}}for(var k=0;k<b;k++){{a+=k}}return a}}"
+        elif choice == 1:
+            part = f"const g{index}_{i}=async function(x){{return await x}};"
+        elif choice == 2:
+            part = f"class C{index}_{i} extends Base{{render(){{this.el.innerHTML='<b>'+this.v+'</b>'}}}}"
+        else:
+            part = f"var o{i}={{handler:function(e){{setTimeout('run()',10);document.write(e)}}}};"
+        parts.append(part)
+        size += len(part)
+        i += 1
+    return "import x from 'lib';" + "".join(parts) + "\n"
+
+def _java_source(rng: random.Random, config: BenchmarkConfig, index: int) -> str:
+    """Large Java class with many methods."""
+    lines = ['package bench;', '', 'import java.util.List;', 'import java.util.Map;', '',
+             f'public class Large{index} extends BaseService implements Runnable, Closeable {{']
+    for i in range(config.java_methods_per_file):
+        lines.append(f"    public int method{i}(int a, String b) throws IOException {{")
+        lines.append(f"        if (a > {rng.randint(0, 100)}) {{ return System.getProperty(b).length(); }}")
+        lines.append(f"        return a * {i};")
+        lines.append("    }")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+def _html_source(rng: random.Random, config: BenchmarkConfig, index: int) -> str:
+    """HTML page with many forms, inline handlers and script tags."""
+    lines = ['<!DOCTYPE html>', '<html>', '<head><script src="app.js"></script></head>', '<body>']
+    for i in range(config.html_forms_per_file):
+        lines.append(f'<form id="f{i}" action="/submit/{i}">')
+        for j in range(rng.randint(1, 5)):
+            lines.append(f'  <input name="field{j}" type="text">')
+        lines.append(f'  <button onclick="submit{i}()">Go</button>')
+        lines.append('</form>')
+    lines.append('<a href="javascript:void(0)">x</a>')
+    lines.extend(['</body>', '</html>'])
+    return "\n".join(lines) + "\n"
+
+def generate_synthetic_repo(root: str, config: BenchmarkConfig) -> Dict[str, int]:
+    """
+    Write a synthetic repository under root.
+    
+    Args:
+        root: Directory to populate (created if missing)
+        config: Size and language mix
+    
+    Returns:
+        Number of files written per language
+    """
+    rng = random.Random(config.seed)
+    layout = [
+        ('python', 'src/pkg{}/module_{}.py', config.python_files, _python_source),
+        ('javascript', 'web/dist/bundle_{1}.min.js', config.js_files, _minified_js_source),
+        ('java', 'java/src/pkg{}/Large{}.java', config.java_files, _java_source),
+        ('html', 'web/pages/page_{1}.html', config.html_files, _html_source),
+    ]
+    
+    counts = {}
+    for language, pattern, count, generator in layout:
+        for index in range(count):
+            path = os.path.join(root, *pattern.format(index % 8, index).split('/'))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(generator(rng, config, index))
+        counts[language] = count
+    
+    # Noise the walker has to prune
+    os.makedirs(os.path.join(root, 'node_modules', 'dep'), exist_ok=True)
+    with open(os.path.join(root, 'node_modules', 'dep', 'index.js'), 'w', encoding='utf-8') as f:
+        f.write("module.exports = function(){};\n")
+    
+    return counts
+
+def _time_stage(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Run func repeat times with analyzer output silenced; report best and mean."""
+    timings = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    return {
+        'best_seconds': min(timings),
+        'mean_seconds': sum(timings) / len(timings),
+        'runs': len(timings)
+    }
+
+def run_benchmarks(config: BenchmarkConfig, repo_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Generate a synthetic repository (unless repo_path is given) and time each stage.
+    
+    The analyzer runs with profiling enabled, so besides the wall-clock stages
+    the results carry profiling.stage_seconds: the best time per analysis stage
+    (read, parse, extract, security, ...) summed over the serial repository runs.
+    
+    Returns:
+        Machine-readable benchmark results
+    """
+    with tempfile.TemporaryDirectory() as scratch:
+        root = repo_path or scratch
+        file_counts = generate_synthetic_repo(root, config) if repo_path is None else {}
+        
+        analyzer = SmartCodeAnalyzer(profile=True)
+        code_files = analyzer._find_code_files(root)
+        by_type: Dict[str, List[str]] = {}
+        for file_path in code_files:
+            by_type.setdefault(os.path.splitext(file_path)[1], []).append(file_path)
+        
+        stages = {'discover_files': _time_stage(lambda: analyzer._find_code_files(root), config.repeat)}
+        
+        for file_type, files in sorted(by_type.items()):
+            stages[f"analyze_files{file_type.replace('.', '_')}"] = _time_stage(
+                lambda files=files: [analyzer._analyze_file(path) for path in files], config.repeat)
+        
+        profiled_runs = []
+        stages['analyze_repository_serial'] = _time_stage(
+            lambda: profiled_runs.append(analyzer.analyze_repository(root)['profiling']['stage_seconds']),
+            config.repeat)
+        stage_seconds = {stage: min(run.get(stage, 0.0) for run in profiled_runs)
+                         for stage in profiled_runs[0]}
+        if config.workers > 1:
+            stages['analyze_repository_parallel'] = _time_stage(
+                lambda: analyzer.analyze_repository(root, workers=config.workers), config.repeat)
+        
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = analyzer.analyze_repository(root)
+        stages['generate_report'] = _time_stage(
+            lambda: analyzer.generate_analysis_report(results), config.repeat)
+        
+        total_bytes = sum(os.path.getsize(path) for path in code_files)
+    
+    return {
+        'benchmark_timestamp': datetime.now().isoformat(),
+        'analyzer_version': ANALYZER_VERSION,
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        },
+        'config': asdict(config),
+        'corpus': {
+            'files': len(code_files),
+            'bytes': total_bytes,
+            'files_per_language': file_counts
+        },
+        'stages': stages,
+        'profiling': {'stage_seconds': stage_seconds}
+    }
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float = 0.2, min_delta_seconds: float = 0.005) -> List[Dict[str, Any]]:
+    """
+    Find stages that got slower than the baseline.
+    
+    A stage regresses when its best time exceeds the baseline's by more than
+    threshold (a fraction) and by more than min_delta_seconds, which filters
+    out noise on very fast stages. Profiled analysis stages are compared too,
+    reported as 'profiling.<stage>'.
+    
+    Returns:
+        One entry per regressed stage
+    """
+    def best_times(results: Dict[str, Any]) -> Dict[str, float]:
+        times = {stage: timing['best_seconds'] for stage, timing in results.get('stages', {}).items()}
+        for stage, seconds in results.get('profiling', {}).get('stage_seconds', {}).items():
+            times[f"profiling.{stage}"] = seconds
+        return times
+    
+    previous_times = best_times(baseline)
+    regressions = []
+    for stage, after in best_times(current).items():
+        before = previous_times.get(stage)
+        if before is None:
+            continue
+        if after > before * (1 + threshold) and after - before > min_delta_seconds:
+            regressions.append({
+                'stage': stage,
+                'baseline_seconds': before,
+                'current_seconds': after,
+                'slowdown': after / before if before else float('inf')
+            })
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point; returns a non-zero exit code on regression."""
+    parser = argparse.ArgumentParser(description="Benchmark SmartCodeAnalyzer on synthetic repositories")
+    parser.add_argument('--output', help="Write results JSON to this path")
+    parser.add_argument('--baseline', help="Compare against a previous results JSON")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Allowed slowdown fraction (default 0.2)")
+    parser.add_argument('--repo', help="Benchmark an existing repository instead of a synthetic one")
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiply every file count by this factor")
+    parser.add_argument('--workers', type=int, default=BenchmarkConfig.workers)
+    parser.add_argument('--repeat', type=int, default=BenchmarkConfig.repeat)
+    args = parser.parse_args(argv)
+    
+    config = BenchmarkConfig(workers=args.workers, repeat=args.repeat)
+    for field in ('python_files', 'js_files', 'java_files', 'html_files'):
+        setattr(config, field, max(1, int(getattr(config, field) * args.scale)))
+    
+    print("⏱️ Smart Analyzer Benchmark")
+    print("=" * 60)
+    results = run_benchmarks(config, args.repo)
+    
+    print(f"📁 Corpus: {results['corpus']['files']} files, {results['corpus']['bytes'] / 1024:.0f} KiB")
+    for stage, timing in results['stages'].items():
+        print(f"  {stage:<32} best {timing['best_seconds'] * 1000:9.1f} ms   mean {timing['mean_seconds'] * 1000:9.1f} ms")
+    print("🔬 Analysis stages (best serial run):")
+    for stage, seconds in results['profiling']['stage_seconds'].items():
+        print(f"  {stage:<32} {seconds * 1000:9.1f} ms")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results saved to: {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print(f"🚨 {len(regressions)} stage(s) regressed beyond {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression['stage']}: {regression['baseline_seconds'] * 1000:.1f} ms -> "
+                      f"{regression['current_seconds'] * 1000:.1f} ms ({regression['slowdown']:.2f}x)")
+            return 1
+        print("✅ No regressions against baseline")
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Import-Time Benchmark
+Measures the cold import time of every top-level module in this repository.
+
+Each module is imported in a fresh interpreter so nothing is already cached:
+    
+    python benchmark_imports.py --output imports.json
+    python benchmark_imports.py --baseline imports.json --threshold 0.5
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Runs inside the child interpreter; prints the import time in seconds
+_IMPORT_SNIPPET = (
+    "import time, sys\n"
+    "start = time.perf_counter()\n"
+    "import {module}\n"
+    "sys.stdout.write(repr(time.perf_counter() - start))\n"
+)
+
+def find_top_level_modules(root: str = REPO_ROOT) -> List[str]:
+    """Names of the .py modules directly under root."""
+    return sorted(
+        name[:-3] for name in os.listdir(root)
+        if name.endswith('.py') and not name.startswith('.')
+    )
+
+def time_import(module: str, repeat: int = 3, root: str = REPO_ROOT) -> Dict[str, Any]:
+    """
+    Import a module in fresh interpreters and report the best time.
+    
+    Returns:
+        {'status': 'success', 'best_seconds', 'mean_seconds'} or
+        {'status': 'error', 'error'} if the import fails
+    """
+    timings = []
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, '-c', _IMPORT_SNIPPET.format(module=module)],
+            cwd=root, capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            error_lines = completed.stderr.strip().splitlines()
+            return {'status': 'error', 'error': error_lines[-1] if error_lines else 'import failed'}
+        # Module-level prints come first; the timing is the final token
+        timings.append(float(completed.stdout.split()[-1]))
+    
+    return {
+        'status': 'success',
+        'best_seconds': min(timings),
+        'mean_seconds': sum(timings) / len(timings)
+    }
+
+def run_import_benchmarks(repeat: int = 3, root: str = REPO_ROOT) -> Dict[str, Any]:
+    """Time every top-level module; machine-readable results."""
+    return {
+        'benchmark_timestamp': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'modules': {module: time_import(module, repeat, root) for module in find_top_level_modules(root)}
+    }
+
+def compare_import_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                           threshold: float = 0.5, min_delta_seconds: float = 0.005) -> List[Dict[str, Any]]:
+    """
+    Find modules whose import got slower, or started failing, since the baseline.
+    
+    Returns:
+        One entry per regressed module
+    """
+    regressions = []
+    for module, timing in current['modules'].items():
+        previous = baseline.get('modules', {}).get(module)
+        if not previous or previous['status'] != 'success':
+            continue
+        if timing['status'] != 'success':
+            regressions.append({'module': module, 'error': timing['error']})
+            continue
+        before = previous['best_seconds']
+        after = timing['best_seconds']
+        if after > before * (1 + threshold) and after - before > min_delta_seconds:
+            regressions.append({'module': module, 'baseline_seconds': before, 'current_seconds': after})
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point; returns a non-zero exit code on regression."""
+    parser = argparse.ArgumentParser(description="Measure cold import time of every top-level module")
+    parser.add_argument('--output', help="Write results JSON to this path")
+    parser.add_argument('--baseline', help="Compare against a previous results JSON")
+    parser.add_argument('--threshold', type=float, default=0.5, help="Allowed slowdown fraction (default 0.5)")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+    
+    print("⏱️ Import-Time Benchmark")
+    print("=" * 60)
+    results = run_import_benchmarks(args.repeat)
+    
+    for module, timing in results['modules'].items():
+        if timing['status'] == 'success':
+            print(f"  {module:<32} {timing['best_seconds'] * 1000:8.1f} ms")
+        else:
+            print(f"  {module:<32} ❌ {timing['error']}")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results saved to: {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_import_results(results, baseline, args.threshold)
+        if regressions:
+            print(f"🚨 {len(regressions)} module(s) regressed:")
+            for regression in regressions:
+                if 'error' in regression:
+                    print(f"  {regression['module']}: now fails to import ({regression['error']})")
+                else:
+                    print(f"  {regression['module']}: {regression['baseline_seconds'] * 1000:.1f} ms -> "
+                          f"{regression['current_seconds'] * 1000:.1f} ms")
+            return 1
+        print("✅ No regressions against baseline")
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,393 @@
+"""
+Clone Detector - Repository-Wide Duplicate Code Detection
+This module finds copy-pasted code with winnowed Rabin-Karp fingerprints over
+normalized token streams and reports clone groups with their locations.
+"""
+
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from typing import Dict, List, Any, Optional, Tuple
+
+from smart_analyzer import export_record
+
+# Identifiers are normalized to one token so renamed copies still match;
+# keywords keep their own spelling so control flow must agree
+KEYWORDS = frozenset({
+    'and', 'as', 'assert', 'async', 'await', 'break', 'case', 'catch', 'class', 'const', 'continue',
+    'def', 'default', 'del', 'do', 'elif', 'else', 'except', 'extends', 'finally', 'for', 'from',
+    'function', 'global', 'if', 'import', 'in', 'is', 'lambda', 'let', 'new', 'not', 'or', 'pass',
+    'private', 'protected', 'public', 'raise', 'return', 'static', 'switch', 'this', 'throw',
+    'throws', 'try', 'var', 'void', 'while', 'with', 'yield'
+})
+
+_HASH_BASE = 1000003
+_HASH_MODULUS = (1 << 61) - 1
+
+_QUOTED_STRING = r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\''
+_C_LIKE_LITERALS = (r'//[^\n]*|/\*.*?\*/', _QUOTED_STRING + r'|`(?:\\.|[^`\\])*`')
+
+# Comment and string literal patterns per file type
+LITERAL_PATTERNS = {
+    '.py': (r'#[^\n]*', r'"""(?:\\.|[^\\])*?"""|\'\'\'(?:\\.|[^\\])*?\'\'\'|' + _QUOTED_STRING),
+    '.js': _C_LIKE_LITERALS,
+    '.ts': _C_LIKE_LITERALS,
+    '.java': _C_LIKE_LITERALS,
+    '.css': (r'/\*.*?\*/', _QUOTED_STRING),
+    '.html': (r'<!--.*?-->', None),
+}
+
+# Fallback for unknown file types: '#', '//' and '/* */' comments
+GENERIC_LITERALS = (r'#[^\n]*|//[^\n]*|/\*.*?\*/', _QUOTED_STRING)
+
+_token_patterns: Dict[Any, re.Pattern] = {}
+
+def _token_pattern(file_ext: str) -> re.Pattern:
+    """Tokenizer for a file type: its comments and strings plus names, numbers and operators."""
+    literals = LITERAL_PATTERNS.get(file_ext, GENERIC_LITERALS)
+    pattern = _token_patterns.get(literals)
+    if pattern is None:
+        comment, string = literals
+        alternatives = [f"(?P<comment>{comment})"]
+        if string:
+            alternatives.append(f"(?P<string>{string})")
+        pattern = re.compile(
+            '|'.join(alternatives)
+            + r'|(?P<name>[A-Za-z_$][\w$]*)|(?P<number>\d[\w.]*)|(?P<newline>\n)|(?P<op>[^\s\w])',
+            re.DOTALL
+        )
+        _token_patterns[literals] = pattern
+    return pattern
+
+def normalize_tokens(content: str, file_ext: str) -> Tuple[List[str], List[int]]:
+    """
+    Normalized token stream of a file and the line each token starts on.
+    
+    Comments and whitespace are dropped, every string literal becomes 'S',
+    every number 'N' and every non-keyword identifier 'I'. Python docstrings
+    (a string opening the line after a ':') are dropped like comments, so
+    copies that differ only in documentation still match.
+    """
+    tokens: List[str] = []
+    lines: List[int] = []
+    line = 1
+    skip_docstrings = file_ext == '.py'
+    for match in _token_pattern(file_ext).finditer(content):
+        kind = match.lastgroup
+        if kind == 'newline':
+            line += 1
+            continue
+        text = match.group()
+        if kind == 'comment':
+            line += text.count('\n')
+            continue
+        if kind == 'string':
+            if skip_docstrings and tokens and tokens[-1] == ':' and lines[-1] < line:
+                line += text.count('\n')
+                continue
+            token = 'S'
+        elif kind == 'name':
+            token = text if text in KEYWORDS else 'I'
+        elif kind == 'number':
+            token = 'N'
+        else:
+            token = text
+        tokens.append(token)
+        lines.append(line)
+        if kind == 'string':
+            line += text.count('\n')
+    return tokens, lines
+
+class CloneDetector:
+    """
+    Winnowing-based duplicate code index.
+    
+    Every k consecutive normalized tokens are hashed with a Rabin-Karp
+    rolling hash, and winnowing keeps only the minimum hash of each window
+    of w hashes. Any shared run of at least k + w - 1 tokens is therefore
+    guaranteed to share a fingerprint, while only about 2/(w+1) of the
+    positions are stored. Token streams are discarded once a file is
+    fingerprinted, so the index grows linearly with the number of tokens
+    (about 2/(w+1) postings per token). A hash seen in more than
+    max_postings places is treated as boilerplate and dropped, and each
+    posting is only paired with the next pair_window copies of its hash, so
+    matching work is linear in the index size too.
+    
+    Functions are also matched whole: when a file's function records are
+    given, each function's normalized token sequence is kept packed (four
+    bytes per token) and used as the match key, so only identical bodies
+    match and short copied functions below the block threshold are still
+    found.
+    """
+    
+    def __init__(self, k: int = 12, window: int = 8, min_tokens: int = 30, max_postings: int = 64,
+                 min_function_tokens: int = 12, pair_window: int = 16):
+        self.k = k
+        self.window = window
+        self.min_tokens = min_tokens
+        self.max_postings = max_postings
+        self.pair_window = pair_window
+        self.min_function_tokens = min_function_tokens
+        self.files: List[str] = []
+        self.file_tokens: List[int] = []
+        self.index: Dict[int, List[tuple]] = {}
+        self.function_index: Dict[bytes, List[tuple]] = {}
+        self._common: set = set()
+        self._token_ids: Dict[str, int] = {}
+    
+    def add_file(self, file_path: str, content: str, file_ext: str,
+                 functions: Optional[List[Any]] = None):
+        """
+        Fingerprint one file and add it to the index.
+        
+        Args:
+            file_path: Path reported in clone locations
+            content: File content
+            file_ext: File extension, selects the tokenizer
+            functions: Optional function records from the analyzer; those
+                with a line_count are also matched as whole functions
+        """
+        tokens, lines = normalize_tokens(content, file_ext)
+        file_id = len(self.files)
+        self.files.append(file_path)
+        self.file_tokens.append(len(tokens))
+        token_ids = self._token_ids
+        ids = [token_ids.setdefault(token, len(token_ids) + 1) for token in tokens]
+        
+        for record in functions or []:
+            record = export_record(record)
+            if not record.get('line_count'):
+                continue
+            start_line = record['line_number']
+            end_line = start_line + record['line_count'] - 1
+            body = ids[bisect_left(lines, start_line):bisect_right(lines, end_line)]
+            if len(body) >= self.min_function_tokens:
+                # Keyed by the body itself, so dict lookup compares whole bodies on a hash match
+                self.function_index.setdefault(array('I', body).tobytes(), []).append(
+                    (file_id, record['name'], start_line, end_line, len(body)))
+        
+        for fingerprint, position in self._winnow(ids):
+            if fingerprint in self._common:
+                continue
+            postings = self.index.setdefault(fingerprint, [])
+            if len(postings) >= self.max_postings:
+                del self.index[fingerprint]
+                self._common.add(fingerprint)
+                continue
+            postings.append((file_id, position, lines[position], lines[position + self.k - 1]))
+    
+    def _winnow(self, ids: List[int]):
+        """Yield (hash, token position) fingerprints of a token id stream selected by winnowing."""
+        k = self.k
+        if len(ids) < k:
+            return
+        
+        top = pow(_HASH_BASE, k - 1, _HASH_MODULUS)
+        value = 0
+        for token_id in ids[:k]:
+            value = (value * _HASH_BASE + token_id) % _HASH_MODULUS
+        
+        # Monotonic deque of (hash, position): the window minimum is at the left
+        candidates: deque = deque()
+        last_selected = -1
+        for position in range(len(ids) - k + 1):
+            if position:
+                value = ((value - ids[position - 1] * top) * _HASH_BASE + ids[position + k - 1]) % _HASH_MODULUS
+            while candidates and candidates[-1][0] >= value:
+                candidates.pop()
+            candidates.append((value, position))
+            if candidates[0][1] <= position - self.window:
+                candidates.popleft()
+            if position >= self.window - 1 or position == len(ids) - k:
+                selected = candidates[0]
+                if selected[1] != last_selected:
+                    last_selected = selected[1]
+                    yield selected
+    
+    def clone_groups(self) -> List[Dict[str, Any]]:
+        """
+        Duplicated functions and code blocks across the indexed files.
+        
+        Function groups come first. Block groups whose every copy lies inside
+        an already reported function copy are left out.
+        
+        Returns:
+            Groups, each with 'kind' ('function' or 'block'), 'instances',
+            'tokens', 'lines' and 'locations' (file_path, start_line,
+            end_line, tokens, plus 'name' for functions)
+        """
+        function_groups = self._function_groups()
+        covered: Dict[str, List[tuple]] = {}
+        for group in function_groups:
+            for location in group['locations']:
+                covered.setdefault(location['file_path'], []).append((location['start_line'], location['end_line']))
+        
+        def is_covered(location: Dict[str, Any]) -> bool:
+            return any(start <= location['start_line'] and location['end_line'] <= end
+                       for start, end in covered.get(location['file_path'], ()))
+        
+        block_groups = [group for group in self._block_groups()
+                        if not all(is_covered(location) for location in group['locations'])]
+        return function_groups + block_groups
+    
+    def _function_groups(self) -> List[Dict[str, Any]]:
+        """Groups of functions with identical normalized token sequences."""
+        groups = []
+        for entries in self.function_index.values():
+            if len(entries) < 2:
+                continue
+            locations = sorted(({
+                'file_path': self.files[file_id],
+                'name': name,
+                'start_line': start_line,
+                'end_line': end_line,
+                'tokens': tokens
+            } for file_id, name, start_line, end_line, tokens in entries),
+                key=lambda location: (location['file_path'], location['start_line']))
+            # A nested function is part of its parent's body; keep only the outermost copies
+            locations = [location for location in locations if not any(
+                other is not location and other['file_path'] == location['file_path']
+                and other['start_line'] <= location['start_line'] and location['end_line'] <= other['end_line']
+                for other in locations)]
+            if len(locations) < 2:
+                continue
+            groups.append({
+                'kind': 'function',
+                'instances': len(locations),
+                'tokens': locations[0]['tokens'],
+                'lines': min(location['end_line'] - location['start_line'] + 1 for location in locations),
+                'locations': locations
+            })
+        groups.sort(key=lambda group: (-group['tokens'] * (group['instances'] - 1),
+                                       group['locations'][0]['file_path'], group['locations'][0]['start_line']))
+        return groups
+    
+    def _block_groups(self) -> List[Dict[str, Any]]:
+        """
+        Group duplicated token regions.
+        
+        Each posting of a shared fingerprint is paired with the next
+        pair_window postings in index order (file, then position), so a
+        boilerplate hash costs at most pair_window pairs per posting rather
+        than one pair per two copies. Pairs are chained along each diagonal
+        into regions of at least min_tokens tokens, and regions that overlap
+        in the same file are joined so every copy of a block lands in one
+        group.
+        """
+        matches: Dict[tuple, List[tuple]] = {}
+        pair_window = self.pair_window
+        for postings in self.index.values():
+            for i, first in enumerate(postings):
+                for second in postings[i + 1:i + 1 + pair_window]:
+                    key = (first[0], second[0], second[1] - first[1])
+                    matches.setdefault(key, []).append((first, second))
+        
+        regions = []
+        gap = self.k + self.window
+        for (file_a, file_b, _), pairs in matches.items():
+            pairs.sort(key=lambda pair: pair[0][1])
+            run = [pairs[0]]
+            for pair in pairs[1:] + [None]:
+                if pair is not None and pair[0][1] - run[-1][0][1] <= gap:
+                    run.append(pair)
+                    continue
+                start_a, start_b = run[0]
+                end_a, end_b = run[-1]
+                tokens = end_a[1] + self.k - start_a[1]
+                overlapping = file_a == file_b and start_b[1] < end_a[1] + self.k
+                if tokens >= self.min_tokens and not overlapping:
+                    regions.append((
+                        (file_a, start_a[1], end_a[1] + self.k, start_a[2], end_a[3]),
+                        (file_b, start_b[1], end_b[1] + self.k, start_b[2], end_b[3]),
+                        tokens
+                    ))
+                run = [pair]
+        
+        return self._group_regions(regions)
+    
+    def _group_regions(self, regions: List[tuple]) -> List[Dict[str, Any]]:
+        """Union paired regions into clone groups via overlapping spans."""
+        spans_by_file: Dict[int, List[tuple]] = {}
+        for first, second, _ in regions:
+            spans_by_file.setdefault(first[0], []).append(first)
+            spans_by_file.setdefault(second[0], []).append(second)
+        
+        # Merge overlapping spans within each file into one cluster node
+        cluster_of: Dict[tuple, int] = {}
+        clusters: List[List[int]] = []
+        for file_id, spans in spans_by_file.items():
+            spans.sort(key=lambda span: span[1])
+            current = None
+            for span in spans:
+                if current is None or span[1] >= clusters[current][2]:
+                    clusters.append([file_id, span[1], span[2], span[3], span[4]])
+                    current = len(clusters) - 1
+                else:
+                    cluster = clusters[current]
+                    cluster[2] = max(cluster[2], span[2])
+                    cluster[4] = max(cluster[4], span[4])
+                cluster_of[span] = current
+        
+        parent = list(range(len(clusters)))
+        
+        def find(node: int) -> int:
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+        
+        for first, second, _ in regions:
+            parent[find(cluster_of[first])] = find(cluster_of[second])
+        
+        members: Dict[int, List[int]] = {}
+        for node in range(len(clusters)):
+            members.setdefault(find(node), []).append(node)
+        
+        groups = []
+        for nodes in members.values():
+            locations = [{
+                'file_path': self.files[clusters[node][0]],
+                'start_line': clusters[node][3],
+                'end_line': clusters[node][4],
+                'tokens': clusters[node][2] - clusters[node][1]
+            } for node in nodes]
+            locations.sort(key=lambda location: (location['file_path'], location['start_line']))
+            groups.append({
+                'kind': 'block',
+                'instances': len(locations),
+                'tokens': min(location['tokens'] for location in locations),
+                'lines': min(location['end_line'] - location['start_line'] + 1 for location in locations),
+                'locations': locations
+            })
+        
+        groups.sort(key=lambda group: (-group['tokens'] * (group['instances'] - 1),
+                                       group['locations'][0]['file_path'], group['locations'][0]['start_line']))
+        return groups
+    
+    def stats(self) -> Dict[str, int]:
+        """Indexed files, tokens and stored fingerprints."""
+        return {
+            'files': len(self.files),
+            'tokens': sum(self.file_tokens),
+            'fingerprints': sum(len(postings) for postings in self.index.values()),
+            'dropped_common_hashes': len(self._common)
+        }
+
+if __name__ == "__main__":
+    import io
+    import sys
+    import contextlib
+    from smart_analyzer import SmartCodeAnalyzer
+    
+    repo_path = sys.argv[1] if len(sys.argv) > 1 else "."
+    analyzer = SmartCodeAnalyzer(detect_duplicates=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = analyzer.analyze_repository(repo_path)
+    
+    print(f"🧬 {len(results['clone_groups'])} clone groups")
+    for group in results['clone_groups'][:10]:
+        print(f"- {group['instances']} copies of a ~{group['lines']}-line {group['kind']} ({group['tokens']} tokens):")
+        for location in group['locations']:
+            name = f" {location['name']}" if 'name' in location else ""
+            print(f"    {location['file_path']}:{location['start_line']}-{location['end_line']}{name}")
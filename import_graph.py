@@ -0,0 +1,299 @@
+"""
+Import Graph - Repository Dependency Graph Built from Analyzer Imports
+This module resolves the import strings collected by SmartCodeAnalyzer to
+repository files and keeps a forward and reverse adjacency structure that can
+be updated one file at a time, so re-analysis and re-documentation can be
+scoped to the files a change actually affects.
+"""
+
+import posixpath
+from collections import deque
+from typing import Dict, List, Set, Any, Iterable, Optional
+
+PYTHON_EXTENSIONS = ('.py',)
+SCRIPT_EXTENSIONS = ('.js', '.ts')
+SCRIPT_RESOLUTION_SUFFIXES = ('', '.ts', '.js', '/index.ts', '/index.js')
+
+class ImportGraph:
+    """
+    Directed graph of file -> imported file, with O(1) reverse lookups.
+    
+    Nodes are repository-relative POSIX paths. Imports are resolved only
+    against files already in the graph:
+    
+    - Python: 'a.b.c' (or 'a.b.name' from a from-import) maps to the longest
+      matching a/b/c.py or a/b/__init__.py, tried next to the importing file
+      first and then from the repository root.
+    - JavaScript/TypeScript: relative specifiers ('./x', '../y') with the
+      usual extension and index-file fallbacks; bare package names are external.
+    - Java: 'com.x.Name' maps to files ending in com/x/Name.java, and
+      'com.x.*' to every .java file in a directory ending in com/x.
+    
+    Every candidate location an import could resolve to is watched, so adding
+    or removing a file re-links exactly the importers whose resolution might
+    change instead of rebuilding the graph.
+    """
+    
+    def __init__(self):
+        self.imports: Dict[str, List[str]] = {}
+        self.edges: Dict[str, Set[str]] = {}
+        self.reverse: Dict[str, Set[str]] = {}
+        self._java_by_name: Dict[str, Set[str]] = {}
+        self._java_dirs: Dict[str, Dict[str, Set[str]]] = {}
+        self._watched_keys: Dict[str, Set[str]] = {}
+        self._watchers: Dict[str, Set[str]] = {}
+    
+    @classmethod
+    def from_analyses(cls, files: Dict[str, Dict[str, Any]]) -> 'ImportGraph':
+        """
+        Build a graph from per-file analyses keyed by repository-relative path.
+        
+        All nodes are registered before any import is resolved, so the build
+        is a single linking pass.
+        """
+        graph = cls()
+        for path, analysis in files.items():
+            graph._add_node(_normalize(path), analysis.get('imports', []))
+        for path in graph.imports:
+            graph._link(path)
+        return graph
+    
+    def __contains__(self, path: str) -> bool:
+        return _normalize(path) in self.imports
+    
+    def __len__(self) -> int:
+        return len(self.imports)
+    
+    def update_file(self, path: str, imports: Iterable[str]):
+        """
+        Add a file or replace its imports.
+        
+        Args:
+            path: Repository-relative path of the file
+            imports: Import strings as collected by the analyzer
+        """
+        path = _normalize(path)
+        is_new = path not in self.imports
+        if is_new:
+            self._add_node(path, imports)
+        else:
+            self.imports[path] = list(imports)
+        self._link(path)
+        if is_new:
+            self._relink_watchers(self._node_keys(path))
+    
+    def remove_file(self, path: str):
+        """Remove a file; its importers are re-linked and may resolve elsewhere."""
+        path = _normalize(path)
+        if path not in self.imports:
+            return
+        
+        self._unlink(path)
+        del self.imports[path]
+        del self.edges[path]
+        importers = self.reverse.pop(path)
+        for importer in importers:
+            self.edges[importer].discard(path)
+        
+        if path.endswith('.java'):
+            directory, name = posixpath.split(path)
+            self._java_by_name[name].discard(path)
+            self._java_dirs[posixpath.basename(directory)][directory].discard(path)
+        
+        self._relink_watchers(self._node_keys(path))
+    
+    def dependencies(self, path: str) -> Set[str]:
+        """Files directly imported by path."""
+        return set(self.edges.get(_normalize(path), ()))
+    
+    def dependents(self, path: str) -> Set[str]:
+        """Files that directly import path."""
+        return set(self.reverse.get(_normalize(path), ()))
+    
+    def transitive_dependents(self, paths: Iterable[str]) -> Set[str]:
+        """Every file that imports any of paths, directly or indirectly (excluding paths)."""
+        return self._reach(paths, self.reverse)
+    
+    def transitive_dependencies(self, paths: Iterable[str]) -> Set[str]:
+        """Every file that any of paths imports, directly or indirectly (excluding paths)."""
+        return self._reach(paths, self.edges)
+    
+    def affected_files(self, changed_paths: Iterable[str]) -> Set[str]:
+        """Changed files plus everything that depends on them; the set to re-analyze."""
+        changed = {_normalize(path) for path in changed_paths}
+        return changed | self.transitive_dependents(changed)
+    
+    def find_cycles(self) -> List[List[str]]:
+        """
+        Import cycles, as strongly connected components.
+        
+        Uses an iterative Tarjan's algorithm (linear time, no recursion limit).
+        Returns every component with more than one file, plus files importing
+        themselves, each sorted, largest component first.
+        """
+        index_of: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        cycles = []
+        counter = 0
+        
+        for root in self.imports:
+            if root in index_of:
+                continue
+            index_of[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self.edges[root]))]
+            
+            while work:
+                node, children = work[-1]
+                for child in children:
+                    if child not in index_of:
+                        index_of[child] = lowlink[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(self.edges[child])))
+                        break
+                    if child in on_stack:
+                        lowlink[node] = min(lowlink[node], index_of[child])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+                    if lowlink[node] == index_of[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        if len(component) > 1 or node in self.edges[node]:
+                            cycles.append(sorted(component))
+        
+        cycles.sort(key=lambda component: (-len(component), component))
+        return cycles
+    
+    def stats(self) -> Dict[str, int]:
+        """Node and edge counts."""
+        edges = sum(len(targets) for targets in self.edges.values())
+        return {'files': len(self.imports), 'edges': edges}
+    
+    def _reach(self, paths: Iterable[str], adjacency: Dict[str, Set[str]]) -> Set[str]:
+        """Breadth-first closure over adjacency from several starting files."""
+        start = {_normalize(path) for path in paths}
+        seen = set(start)
+        queue = deque(start)
+        while queue:
+            for neighbour in adjacency.get(queue.popleft(), ()):
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    queue.append(neighbour)
+        return seen - start
+    
+    def _add_node(self, path: str, imports: Iterable[str]):
+        self.imports[path] = list(imports)
+        self.edges[path] = set()
+        self.reverse.setdefault(path, set())
+        if path.endswith('.java'):
+            directory, name = posixpath.split(path)
+            self._java_by_name.setdefault(name, set()).add(path)
+            self._java_dirs.setdefault(posixpath.basename(directory), {}).setdefault(directory, set()).add(path)
+    
+    def _node_keys(self, path: str) -> List[str]:
+        """Watch keys under which a file can satisfy an import."""
+        if path.endswith('.java'):
+            directory, name = posixpath.split(path)
+            return [f"java:{name}", f"javadir:{posixpath.basename(directory)}"]
+        return [path]
+    
+    def _link(self, path: str):
+        """Resolve a file's imports and replace its outgoing edges and watches."""
+        self._unlink(path)
+        targets: Set[str] = set()
+        keys: Set[str] = set()
+        directory, name = posixpath.split(path)
+        extension = posixpath.splitext(name)[1]
+        for import_name in self.imports[path]:
+            if extension in PYTHON_EXTENSIONS:
+                targets.add(self._resolve_python(path, directory, import_name, keys))
+            elif extension in SCRIPT_EXTENSIONS:
+                targets.add(self._resolve_script(directory, import_name, keys))
+            elif extension == '.java':
+                targets.update(self._resolve_java(import_name, keys))
+        targets.discard(None)
+        
+        self.edges[path] = targets
+        for target in targets:
+            self.reverse[target].add(path)
+        self._watched_keys[path] = keys
+        for key in keys:
+            self._watchers.setdefault(key, set()).add(path)
+    
+    def _unlink(self, path: str):
+        for target in self.edges.get(path, ()):
+            self.reverse[target].discard(path)
+        self.edges[path] = set()
+        for key in self._watched_keys.pop(path, ()):
+            watchers = self._watchers[key]
+            watchers.discard(path)
+            if not watchers:
+                del self._watchers[key]
+    
+    def _relink_watchers(self, keys: List[str]):
+        importers = set()
+        for key in keys:
+            importers |= self._watchers.get(key, set())
+        for importer in importers:
+            if importer in self.imports:
+                self._link(importer)
+    
+    # Each resolver returns the import's target file(s) and adds every candidate
+    # location it tried to keys, so a file appearing there triggers a re-link
+    
+    def _resolve_python(self, importer: str, directory: str, import_name: str, keys: Set[str]) -> Optional[str]:
+        parts = [part for part in import_name.split('.') if part]
+        prefixes = [f"{directory}/", ''] if directory else ['']
+        for length in range(len(parts), 0, -1):
+            module_path = '/'.join(parts[:length])
+            for prefix in prefixes:
+                for candidate in (f"{prefix}{module_path}.py", f"{prefix}{module_path}/__init__.py"):
+                    keys.add(candidate)
+                    if candidate in self.imports and candidate != importer:
+                        return candidate
+        return None
+    
+    def _resolve_script(self, directory: str, specifier: str, keys: Set[str]) -> Optional[str]:
+        if not specifier.startswith('.'):
+            return None
+        base = posixpath.normpath(posixpath.join(directory, specifier))
+        for suffix in SCRIPT_RESOLUTION_SUFFIXES:
+            candidate = base + suffix
+            keys.add(candidate)
+            if candidate in self.imports:
+                return candidate
+        return None
+    
+    def _resolve_java(self, import_name: str, keys: Set[str]) -> Set[str]:
+        parts = import_name.split('.')
+        if parts[-1] == '*':
+            package = '/'.join(parts[:-1])
+            keys.add(f"javadir:{parts[-2]}" if len(parts) > 1 else "javadir:")
+            found = set()
+            for directory, paths in self._java_dirs.get(posixpath.basename(package), {}).items():
+                if directory == package or directory.endswith('/' + package):
+                    found |= paths
+            return found
+        name = f"{parts[-1]}.java"
+        keys.add(f"java:{name}")
+        suffix = '/'.join(parts[:-1] + [name])
+        return {path for path in self._java_by_name.get(name, ())
+                if path == suffix or path.endswith('/' + suffix)}
+
+def _normalize(path: str) -> str:
+    """Repository-relative POSIX form of a path."""
+    return posixpath.normpath(path.replace('\\', '/'))
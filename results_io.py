@@ -0,0 +1,195 @@
+"""
+Results I/O - Streaming Writers and a Compact Binary Archive for Analysis Results
+This module writes SmartCodeAnalyzer results to file handles piece by piece
+(JSON and JSONL) and stores them in a chunked, compressed binary archive whose
+sections can be loaded lazily.
+"""
+
+import json
+import zlib
+import struct
+from typing import Dict, List, Any, Optional, Iterator
+
+from smart_analyzer import _to_jsonable
+
+ARCHIVE_MAGIC = b'SCARCHV1'
+ARCHIVE_FORMAT_VERSION = 1
+# Trailer: table-of-contents offset and length, then the magic again
+_TRAILER = struct.Struct('<QQ8s')
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, default=_to_jsonable, ensure_ascii=False)
+
+def write_json(results: Dict[str, Any], handle: Any):
+    """
+    Stream results as one JSON object to a writable text handle.
+    
+    List sections are written one record at a time, so the full document is
+    never built as a single string. The output is equivalent to json.dump.
+    """
+    handle.write("{")
+    for index, (section, value) in enumerate(results.items()):
+        if index:
+            handle.write(",")
+        handle.write(f"\n{_dumps(section)}: ")
+        if isinstance(value, list):
+            handle.write("[")
+            for position, record in enumerate(value):
+                handle.write(",\n" if position else "\n")
+                handle.write(_dumps(record))
+            handle.write("\n]" if value else "]")
+        else:
+            handle.write(_dumps(value))
+    handle.write("\n}\n")
+
+def write_jsonl(results: Dict[str, Any], handle: Any):
+    """
+    Stream results as JSON Lines: one line per record.
+    
+    The first line holds every non-list section and the names of the list
+    sections; each record of a list section follows as
+    {"section": name, "record": ...}.
+    """
+    header = {section: value for section, value in results.items() if not isinstance(value, list)}
+    lists = [section for section, value in results.items() if isinstance(value, list)]
+    handle.write(_dumps({'section': '_meta', 'record': header, 'lists': lists}) + "\n")
+    for section, value in results.items():
+        if isinstance(value, list):
+            for record in value:
+                handle.write(_dumps({'section': section, 'record': record}) + "\n")
+
+def read_jsonl(handle: Any) -> Dict[str, Any]:
+    """Rebuild a results dictionary written by write_jsonl."""
+    results: Dict[str, Any] = {}
+    for line in handle:
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        if entry['section'] == '_meta':
+            results.update(entry['record'])
+            for section in entry['lists']:
+                results.setdefault(section, [])
+        else:
+            results.setdefault(entry['section'], []).append(entry['record'])
+    return results
+
+def write_results_archive(results: Dict[str, Any], path: str, chunk_records: int = 5000,
+                          compression_level: int = 3) -> Dict[str, Any]:
+    """
+    Write results to a compact binary archive.
+    
+    Layout: magic, then zlib-compressed JSON chunks (list sections are split
+    into chunks of chunk_records records), then a compressed table of
+    contents giving every chunk's offset, length and record count, then a
+    fixed-size trailer pointing at the table of contents.
+    
+    Returns:
+        The table of contents that was written
+    """
+    sections: Dict[str, Any] = {}
+    with open(path, 'wb') as f:
+        f.write(ARCHIVE_MAGIC)
+        
+        def write_chunk(payload: Any) -> List[int]:
+            data = zlib.compress(_dumps(payload).encode('utf-8'), compression_level)
+            offset = f.tell()
+            f.write(data)
+            return [offset, len(data)]
+        
+        for section, value in results.items():
+            if isinstance(value, list):
+                chunks = []
+                for start in range(0, len(value), chunk_records):
+                    batch = value[start:start + chunk_records]
+                    chunks.append(write_chunk(batch) + [len(batch)])
+                sections[section] = {'kind': 'list', 'count': len(value), 'chunks': chunks}
+            else:
+                sections[section] = {'kind': 'value', 'chunks': [write_chunk(value)]}
+        
+        toc = {'format_version': ARCHIVE_FORMAT_VERSION, 'sections': sections}
+        toc_data = zlib.compress(_dumps(toc).encode('utf-8'), compression_level)
+        toc_offset = f.tell()
+        f.write(toc_data)
+        f.write(_TRAILER.pack(toc_offset, len(toc_data), ARCHIVE_MAGIC))
+    return toc
+
+class ResultsArchive:
+    """
+    Lazy reader for archives written by write_results_archive.
+    
+    Opening an archive reads only the trailer and table of contents. A
+    section is decompressed the first time it is accessed and then cached;
+    iter_records() walks a list section chunk by chunk without keeping it.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._loaded: Dict[str, Any] = {}
+        try:
+            if self._file.seek(0, 2) < len(ARCHIVE_MAGIC) + _TRAILER.size:
+                raise ValueError(f"{path} is not a results archive")
+            self._file.seek(-_TRAILER.size, 2)
+            toc_offset, toc_length, magic = _TRAILER.unpack(self._file.read(_TRAILER.size))
+            self._file.seek(0)
+            if magic != ARCHIVE_MAGIC or self._file.read(len(ARCHIVE_MAGIC)) != ARCHIVE_MAGIC:
+                raise ValueError(f"{path} is not a results archive")
+            toc = json.loads(zlib.decompress(self._read(toc_offset, toc_length)))
+        except zlib.error as e:
+            self._file.close()
+            raise ValueError(f"{path} has a corrupt table of contents") from e
+        except Exception:
+            self._file.close()
+            raise
+        if toc['format_version'] != ARCHIVE_FORMAT_VERSION:
+            self._file.close()
+            raise ValueError(f"Unsupported archive format version {toc['format_version']}")
+        self.sections: Dict[str, Any] = toc['sections']
+    
+    def _read(self, offset: int, length: int) -> bytes:
+        self._file.seek(offset)
+        return self._file.read(length)
+    
+    def _chunk(self, offset: int, length: int) -> Any:
+        return json.loads(zlib.decompress(self._read(offset, length)))
+    
+    def __contains__(self, section: str) -> bool:
+        return section in self.sections
+    
+    def __getitem__(self, section: str) -> Any:
+        if section not in self._loaded:
+            entry = self.sections[section]
+            if entry['kind'] == 'list':
+                self._loaded[section] = list(self.iter_records(section))
+            else:
+                offset, length = entry['chunks'][0]
+                self._loaded[section] = self._chunk(offset, length)
+        return self._loaded[section]
+    
+    def get(self, section: str, default: Any = None) -> Any:
+        return self[section] if section in self.sections else default
+    
+    def keys(self) -> List[str]:
+        return list(self.sections)
+    
+    def count(self, section: str) -> Optional[int]:
+        """Number of records in a list section, without loading it."""
+        return self.sections[section].get('count')
+    
+    def iter_records(self, section: str) -> Iterator[Any]:
+        """Yield the records of a list section one chunk at a time."""
+        for offset, length, _ in self.sections[section]['chunks']:
+            yield from self._chunk(offset, length)
+    
+    def load(self) -> Dict[str, Any]:
+        """Load every section into a plain results dictionary."""
+        return {section: self[section] for section in self.sections}
+    
+    def close(self):
+        self._file.close()
+    
+    def __enter__(self) -> 'ResultsArchive':
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
@@ -4,14 +4,68 @@ This module provides intelligent code analysis capabilities with multiple analys
 """
 
 import os
+import sys
 import re
 import ast
+import io
+import codecs
 import json
+import time
+import hashlib
+import heapq
+from bisect import bisect_right
+from collections import deque
 from datetime import datetime
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass, asdict
 from pathlib import Path
 
+# Bump whenever the per-file analysis output changes so cached results are invalidated
+ANALYZER_VERSION = "1.6"
+
+# Directory names never descended into during file discovery
+DEFAULT_EXCLUDED_DIRS = {'__pycache__', 'venv', '.git', 'node_modules', 'target', 'build'}
+
+# Bytes after which a line longer than a whole metrics chunk may be cut
+CHUNK_SEPARATORS = (b' ', b'\t', b';', b',', b'{', b'}', b')')
+
+# Keywords counted as whole words on code lines, and substrings counted by the basic metrics
+COMPLEXITY_INDICATORS = ('if', 'for', 'while', 'try', 'except', 'elif', 'else')
+COMPLEXITY_PATTERN = re.compile(r'\b(?:' + '|'.join(COMPLEXITY_INDICATORS) + r')\b')
+DOCSTRING_MARKERS = ('"""', "'''", '/*')
+COMMENT_PREFIXES = ('#', '//', '/*', '*')
+
+# Report ordering for security issue severities
+SEVERITY_ORDER = {'high': 0, 'medium': 1, 'low': 2}
+
+# Security rules per language: regex pattern -> severity and description
+PYTHON_SECURITY_RULES = {
+    r'eval\s*\(': {'severity': 'high', 'issue': 'Use of eval() function'},
+    r'exec\s*\(': {'severity': 'high', 'issue': 'Use of exec() function'},
+    r'shell=True': {'severity': 'medium', 'issue': 'Shell injection risk'},
+    r'pickle\.loads?\s*\(': {'severity': 'medium', 'issue': 'Unsafe pickle usage'},
+    r'subprocess\.call': {'severity': 'low', 'issue': 'Subprocess usage without validation'},
+}
+
+JS_SECURITY_RULES = {
+    r'eval\s*\(': {'severity': 'high', 'issue': 'Use of eval()'},
+    r'innerHTML\s*=': {'severity': 'medium', 'issue': 'Potential XSS vulnerability'},
+    r'document\.write': {'severity': 'medium', 'issue': 'Potential XSS vulnerability'},
+    r'setTimeout\s*\(\s*["\']': {'severity': 'low', 'issue': 'String in setTimeout'},
+}
+
+JAVA_SECURITY_RULES = {
+    r'Runtime\.getRuntime\(\)\.exec': {'severity': 'high', 'issue': 'Command execution'},
+    r'Class\.forName\s*\(': {'severity': 'medium', 'issue': 'Reflection usage'},
+    r'System\.getProperty': {'severity': 'low', 'issue': 'System property access'},
+}
+
+HTML_SECURITY_RULES = {
+    r'javascript:': {'severity': 'high', 'issue': 'JavaScript protocol'},
+    r'<script[^>]*>': {'severity': 'medium', 'issue': 'Script tag usage'},
+    r'onclick\s*=': {'severity': 'low', 'issue': 'Inline event handler'},
+}
+
 @dataclass
 class CodeMetrics:
     """Data class for storing code metrics"""
@@ -24,127 +78,1179 @@ class CodeMetrics:
     complexity_score: float
     documentation_coverage: float
 
-@dataclass
+@dataclass(slots=True)
 class FunctionInfo:
-    """Data class for function information"""
+    """Data class for function information (slotted, exportable to the dict shape)"""
     name: str
     line_number: int
     parameters: List[str]
     docstring: Optional[str]
     complexity: int
     decorators: List[str]
+    line_count: int = 0
+    
+    @property
+    def has_docstring(self) -> bool:
+        return self.docstring is not None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Export in the dict shape produced by _extract_function_info."""
+        return {
+            'name': self.name,
+            'line_number': self.line_number,
+            'parameters': self.parameters,
+            'docstring': self.docstring,
+            'complexity': self.complexity,
+            'decorators': self.decorators,
+            'has_docstring': self.has_docstring,
+            'line_count': self.line_count
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'FunctionInfo':
+        """Rebuild a record from its dict shape, interning repeated strings."""
+        return cls(
+            name=sys.intern(data['name']),
+            line_number=data['line_number'],
+            parameters=[sys.intern(parameter) for parameter in data['parameters']],
+            docstring=data['docstring'],
+            complexity=data['complexity'],
+            decorators=[sys.intern(decorator) for decorator in data['decorators']],
+            line_count=data.get('line_count', 0)
+        )
 
-@dataclass
+@dataclass(slots=True)
 class ClassInfo:
-    """Data class for class information"""
+    """Data class for class information (slotted, exportable to the dict shape)"""
     name: str
     line_number: int
     methods: List[FunctionInfo]
     base_classes: List[str]
     docstring: Optional[str]
+    
+    @property
+    def has_docstring(self) -> bool:
+        return self.docstring is not None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Export in the dict shape produced by _extract_class_info."""
+        return {
+            'name': self.name,
+            'line_number': self.line_number,
+            'base_classes': self.base_classes,
+            'docstring': self.docstring,
+            'methods': [export_record(method) for method in self.methods],
+            'has_docstring': self.has_docstring,
+            'method_count': len(self.methods)
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ClassInfo':
+        """Rebuild a record from its dict shape, interning repeated strings."""
+        return cls(
+            name=sys.intern(data['name']),
+            line_number=data['line_number'],
+            methods=[FunctionInfo.from_dict(method) for method in data['methods']],
+            base_classes=[sys.intern(base) for base in data['base_classes']],
+            docstring=data['docstring']
+        )
+
+def export_record(record: Any) -> Any:
+    """Return the plain dict shape of a FunctionInfo/ClassInfo; dicts pass through."""
+    if isinstance(record, (FunctionInfo, ClassInfo)):
+        return record.to_dict()
+    return record
+
+class PythonStructureVisitor(ast.NodeVisitor):
+    """
+    Single-pass collector of imports, functions, classes and complexity.
+    
+    Functions and classes are recorded in source order. A function's complexity
+    includes the branches of any functions nested inside it; each nested total
+    is folded into its parent when the nested function is left, so every node
+    is visited exactly once.
+    """
+    
+    BRANCH_NODES = (ast.If, ast.While, ast.For, ast.Try)
+    
+    def __init__(self, analyzer: 'SmartCodeAnalyzer', content: str):
+        self.analyzer = analyzer
+        self.content = content
+        self.imports: List[str] = []
+        self.functions: List[Dict[str, Any]] = []
+        self.classes: List[Dict[str, Any]] = []
+        self.complexity_score = 0
+        self._complexity_stack: List[int] = []
+    
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            self.imports.append(alias.name)
+    
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        module = node.module or ''
+        for alias in node.names:
+            self.imports.append(f"{module}.{alias.name}")
+    
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        index = len(self.functions)
+        self.functions.append(None)
+        
+        self._complexity_stack.append(1)
+        self.generic_visit(node)
+        complexity = self._complexity_stack.pop()
+        if self._complexity_stack:
+            self._complexity_stack[-1] += complexity - 1
+        self.complexity_score += complexity
+        
+        self.functions[index] = self.analyzer._extract_function_info(node, self.content, complexity=complexity)
+    
+    def visit_ClassDef(self, node: ast.ClassDef):
+        index = len(self.classes)
+        self.classes.append(None)
+        
+        # Methods are the direct FunctionDef children; reuse their extracted info
+        methods = []
+        for child in ast.iter_child_nodes(node):
+            function_index = len(self.functions)
+            self.visit(child)
+            if isinstance(child, ast.FunctionDef):
+                methods.append(self.functions[function_index])
+        
+        self.classes[index] = self.analyzer._extract_class_info(node, self.content, methods=methods)
+    
+    def _visit_branch(self, node: ast.AST):
+        if self._complexity_stack:
+            self._complexity_stack[-1] += 1
+        self.generic_visit(node)
+    
+    visit_If = visit_While = visit_For = visit_Try = _visit_branch
+
+class LineIndex:
+    """
+    Offsets of every line start in a file.
+    
+    Built once per file in a single pass, then maps match offsets to line
+    numbers by binary search instead of re-counting the content prefix.
+    """
+    
+    def __init__(self, content: str):
+        self.line_starts = [0]
+        self.line_starts.extend(match.end() for match in re.finditer('\n', content))
+    
+    def line_number(self, offset: int) -> int:
+        """1-based line number containing offset."""
+        return bisect_right(self.line_starts, offset)
+    
+    def column(self, offset: int) -> int:
+        """1-based column of offset within its line."""
+        return offset - self.line_starts[self.line_number(offset) - 1] + 1
+
+# Regex syntax that ends the literal prefix of a pattern
+_REGEX_METACHARACTERS = set('.^$*+?{}[]|()')
+
+def _leading_literal(pattern: str) -> str:
+    """
+    Literal text every match of a regex must start with, or '' if unknown.
+    
+    Reads plain and backslash-escaped punctuation characters up to the first
+    metacharacter or class escape (such as \\s); a character made optional
+    by ?, * or {} is dropped. Patterns containing | get no literal.
+    """
+    if '|' in pattern:
+        return ''
+    literal = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        step = 1
+        if char == '\\':
+            if index + 1 >= len(pattern) or pattern[index + 1].isalnum():
+                break
+            char = pattern[index + 1]
+            step = 2
+        elif char in _REGEX_METACHARACTERS:
+            break
+        quantifier = pattern[index + step:index + step + 1]
+        if quantifier in ('?', '*', '{'):
+            break
+        literal.append(char)
+        index += step
+        if quantifier == '+':
+            break
+    return ''.join(literal)
+
+class SecurityScanner:
+    """
+    Scanner over a precompiled set of regex rules.
+    
+    Every rule is compiled once and run with its own finditer, so rules that
+    match at the same position each report their hit, with its line and
+    column. Most rules start with literal text (e.g. 'eval' or
+    'document.write'); that keyword is extracted up front and a rule only
+    runs when its keyword occurs in the file, so the per-rule cost for a file
+    that cannot match is one substring search. Rules without a derivable
+    keyword always run.
+    """
+    
+    def __init__(self, rules: Dict[str, Dict[str, str]], flags: int = re.IGNORECASE):
+        self.flags = flags
+        self.rules: List[tuple] = []
+        self._compiled: Optional[List[tuple]] = None
+        self.add_rules(rules)
+    
+    def add_rules(self, rules: Dict[str, Dict[str, str]]):
+        """Add rules (pattern -> {'severity', 'issue'}); compiled on next scan."""
+        self.rules.extend(rules.items())
+        self._compiled = None
+    
+    def _compile(self):
+        fold = str.casefold if self.flags & re.IGNORECASE else str
+        self._compiled = [(re.compile(pattern, self.flags), fold(_leading_literal(pattern)))
+                          for pattern, _ in self.rules]
+    
+    def scan(self, content: str, line_index: Optional[LineIndex] = None) -> List[Dict[str, Any]]:
+        """Return one issue per rule hit, in file order."""
+        if not self.rules:
+            return []
+        if self._compiled is None:
+            self._compile()
+        
+        haystack = None
+        hits = []
+        for rule_index, (matcher, keyword) in enumerate(self._compiled):
+            if keyword:
+                if haystack is None:
+                    haystack = content.casefold() if self.flags & re.IGNORECASE else content
+                if keyword not in haystack:
+                    continue
+            hits.extend((match.start(), rule_index) for match in matcher.finditer(content))
+        
+        if not hits:
+            return []
+        hits.sort()
+        line_index = line_index or LineIndex(content)
+        
+        security_issues = []
+        for position, rule_index in hits:
+            pattern, info = self.rules[rule_index]
+            security_issues.append({
+                'type': 'security_vulnerability',
+                'severity': info['severity'],
+                'issue': info['issue'],
+                'pattern': pattern,
+                'line_number': line_index.line_number(position),
+                'column': line_index.column(position)
+            })
+        
+        return security_issues
+
+class StageClock:
+    """Accumulates wall-clock time per analysis stage for one file."""
+    
+    __slots__ = ('timings', '_last')
+    
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self._last = time.perf_counter()
+    
+    def lap(self, stage: str):
+        """Charge the time since the previous lap to stage."""
+        now = time.perf_counter()
+        self.timings[stage] = self.timings.get(stage, 0.0) + now - self._last
+        self._last = now
+
+class AnalysisProfiler:
+    """
+    Aggregates per-file stage timings into per-stage totals and the slowest files.
+    
+    Lives in the parent process; per-file timings are produced wherever the file
+    was analyzed (including pool workers) and travel back with its result.
+    """
+    
+    def __init__(self, top_n: int = 10, use_cprofile: bool = False):
+        self.top_n = top_n
+        self.stage_seconds: Dict[str, float] = {}
+        self.files_profiled = 0
+        self._slowest: List[tuple] = []
+        self._profile = None
+        if use_cprofile:
+            import cProfile
+            self._profile = cProfile.Profile()
+    
+    def add_stage(self, stage: str, seconds: float):
+        """Charge repository-level time (e.g. the directory walk) to a stage."""
+        self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+    
+    def record_file(self, file_path: str, timings: Dict[str, float]):
+        """Fold one file's stage timings into the totals and slowest-N heap."""
+        for stage, seconds in timings.items():
+            self.add_stage(stage, seconds)
+        self.files_profiled += 1
+        
+        entry = (sum(timings.values()), self.files_profiled, file_path, timings)
+        if len(self._slowest) < self.top_n:
+            heapq.heappush(self._slowest, entry)
+        elif entry[0] > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+    
+    def start(self):
+        """Begin cProfile capture if enabled."""
+        if self._profile:
+            self._profile.enable()
+    
+    def stop(self):
+        """End cProfile capture if enabled."""
+        if self._profile:
+            self._profile.disable()
+    
+    def report(self, cprofile_limit: int = 25) -> Dict[str, Any]:
+        """Profiling section for the results dictionary."""
+        cprofile_text = None
+        if self._profile:
+            import pstats
+            stream = io.StringIO()
+            pstats.Stats(self._profile, stream=stream).sort_stats('cumulative').print_stats(cprofile_limit)
+            cprofile_text = stream.getvalue()
+        
+        return {
+            'stage_seconds': dict(sorted(self.stage_seconds.items(), key=lambda item: item[1], reverse=True)),
+            'files_profiled': self.files_profiled,
+            'slowest_files': [
+                {'file_path': file_path, 'seconds': seconds, 'stages': timings}
+                for seconds, _, file_path, timings in sorted(self._slowest, reverse=True)
+            ],
+            'cprofile': cprofile_text
+        }
+
+class AnalysisCache:
+    """
+    Persistent on-disk cache of per-file analysis results.
+    
+    Entries are keyed by analyzer version, the analyzer's config fingerprint,
+    the file suffix and SHA-256 of the file content, so a renamed or reverted
+    file is still a hit, while an analyzer upgrade, a change to the size limits
+    or security rules, or the same bytes under another extension misses. A (mtime, size) index per path avoids re-hashing unchanged files.
+    Entries unused for max_age_days are evicted on save, and the least recently
+    used entries are dropped once max_entries is exceeded.
+    """
+    
+    def __init__(self, cache_path: str, max_entries: int = 100000, max_age_days: float = 30):
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_days * 86400
+        self.fingerprint = ''
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.file_index: Dict[str, List[Any]] = {}
+        self.pending_keys: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self._load()
+    
+    def _load(self):
+        """Load cache contents from disk, ignoring missing or corrupt files."""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        
+        prefix = f"{ANALYZER_VERSION}:"
+        self.entries = {key: entry for key, entry in data.get('entries', {}).items()
+                        if key.startswith(prefix)}
+        self.file_index = data.get('files', {})
+    
+    def _content_key(self, file_path: str) -> Optional[str]:
+        """Return the cache key for a file, re-hashing only if its stat changed."""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        
+        indexed = self.file_index.get(file_path)
+        if indexed and indexed[0] == stat.st_mtime_ns and indexed[1] == stat.st_size:
+            digest = indexed[2]
+        else:
+            with open(file_path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            self.file_index[file_path] = [stat.st_mtime_ns, stat.st_size, digest]
+        
+        # The suffix picks the language analyzer, so identical bytes can analyze differently
+        suffix = Path(file_path).suffix
+        return f"{ANALYZER_VERSION}:{self.fingerprint}:{suffix}:{digest}"
+    
+    def has(self, file_path: str) -> bool:
+        """Check for a cached entry, counting a miss when there is none."""
+        key = self._content_key(file_path)
+        if key in self.entries:
+            return True
+        self.misses += 1
+        if key is not None:
+            self.pending_keys[file_path] = key
+        return False
+    
+    def get(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Return the cached analysis for a file, or None on a miss."""
+        key = self._content_key(file_path)
+        entry = self.entries.get(key) if key else None
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        entry['last_used'] = time.time()
+        analysis = dict(entry['analysis'])
+        analysis['file_path'] = os.path.relpath(file_path)
+        if analysis.get('metrics') is not None:
+            analysis['metrics'] = CodeMetrics(**analysis['metrics'])
+        return analysis
+    
+    def put(self, file_path: str, analysis: Dict[str, Any]):
+        """
+        Store a freshly computed analysis for a file.
+        
+        Reuses the key has() computed for the miss instead of hashing the file
+        again. If the file's stat changed since then, the analysis may not match
+        that digest, so it is not cached.
+        """
+        key = self.pending_keys.pop(file_path, None)
+        indexed = self.file_index.get(file_path)
+        if key is None or indexed is None:
+            return
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return
+        if indexed[0] != stat.st_mtime_ns or indexed[1] != stat.st_size:
+            self.file_index.pop(file_path, None)
+            return
+        
+        stored = dict(analysis)
+        stored.pop('timings', None)
+        if isinstance(stored.get('metrics'), CodeMetrics):
+            stored['metrics'] = asdict(stored['metrics'])
+        self.entries[key] = {'analysis': stored, 'last_used': time.time()}
+    
+    def evict(self):
+        """Drop stale entries and enforce the size cap."""
+        cutoff = time.time() - self.max_age_seconds
+        self.entries = {key: entry for key, entry in self.entries.items()
+                        if entry['last_used'] >= cutoff}
+        
+        if len(self.entries) > self.max_entries:
+            newest = sorted(self.entries.items(), key=lambda item: item[1]['last_used'], reverse=True)
+            self.entries = dict(newest[:self.max_entries])
+        
+        live_digests = {key.rsplit(':', 1)[1] for key in self.entries}
+        self.file_index = {path: stat for path, stat in self.file_index.items()
+                           if stat[2] in live_digests}
+    
+    def save(self):
+        """Evict and atomically write the cache to disk."""
+        self.evict()
+        directory = os.path.dirname(os.path.abspath(self.cache_path))
+        os.makedirs(directory, exist_ok=True)
+        
+        temp_path = f"{self.cache_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'analyzer_version': ANALYZER_VERSION,
+                       'entries': self.entries,
+                       'files': self.file_index}, f, default=_to_jsonable)
+        os.replace(temp_path, self.cache_path)
+    
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for the current run."""
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries)}
+
+class RunningSummary:
+    """
+    Summary metrics maintained incrementally, one file at a time.
+    
+    Produces the same shape as SmartCodeAnalyzer._calculate_summary_metrics
+    without holding any per-file records.
+    """
+    
+    def __init__(self):
+        self.total_files = 0
+        self.files_analyzed = 0
+        self.file_types: Dict[str, int] = {}
+        self.functions = 0
+        self.classes = 0
+        self.security_issues = 0
+        self.degraded_files = 0
+    
+    def add(self, file_analysis: Dict[str, Any]):
+        """Fold one file's analysis into the running totals."""
+        file_ext = file_analysis['file_type']
+        self.file_types[file_ext] = self.file_types.get(file_ext, 0) + 1
+        self.files_analyzed += 1
+        self.functions += len(file_analysis.get('functions', []))
+        self.classes += len(file_analysis.get('classes', []))
+        self.security_issues += len(file_analysis.get('security_issues', []))
+        if file_analysis.get('degraded'):
+            self.degraded_files += 1
+    
+    def remove(self, file_analysis: Dict[str, Any]):
+        """Take back a previously added file's analysis (e.g. before re-adding a newer one)."""
+        file_ext = file_analysis['file_type']
+        self.file_types[file_ext] -= 1
+        if not self.file_types[file_ext]:
+            del self.file_types[file_ext]
+        self.files_analyzed -= 1
+        self.functions -= len(file_analysis.get('functions', []))
+        self.classes -= len(file_analysis.get('classes', []))
+        self.security_issues -= len(file_analysis.get('security_issues', []))
+        if file_analysis.get('degraded'):
+            self.degraded_files -= 1
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """Summary metrics for the files seen so far."""
+        return {
+            'total_files_analyzed': self.files_analyzed,
+            'total_functions_found': self.functions,
+            'total_classes_found': self.classes,
+            'total_security_issues': self.security_issues,
+            'total_degraded_files': self.degraded_files,
+            'most_common_file_type': max(self.file_types.items(), key=lambda x: x[1])[0] if self.file_types else None,
+            'analysis_quality': 'high' if self.files_analyzed > 0 else 'low',
+            'has_ai_insights': False
+        }
 
 class SmartCodeAnalyzer:
     """
     Advanced AI-powered code analyzer with multiple analysis capabilities.
     """
     
-    def __init__(self, gemini_api_key: str = None):
+    def __init__(self, gemini_api_key: str = None, cache_path: str = None,
+                 exclude_patterns: Optional[List[str]] = None, use_gitignore: bool = False,
+                 large_file_bytes: Optional[int] = None,
+                 max_file_bytes: Optional[int] = None, compact_records: bool = False,
+                 profile: bool = False, profile_top_n: int = 10, use_cprofile: bool = False,
+                 insight_engine: Optional['InsightEngine'] = None, symbol_index_path: str = None,
+                 detect_duplicates: bool = False):
         self.gemini_api_key = gemini_api_key
+        self.insight_engine = insight_engine
         self.supported_extensions = {'.py', '.js', '.ts', '.java', '.html', '.css'}
+        self.excluded_dirs = set(DEFAULT_EXCLUDED_DIRS)
+        self.exclude_patterns = list(exclude_patterns or [])
+        self.use_gitignore = use_gitignore
+        self.large_file_bytes = large_file_bytes
+        self.max_file_bytes = max_file_bytes
+        self.compact_records = compact_records
+        self.profile = profile
+        self.profile_top_n = profile_top_n
+        self.use_cprofile = use_cprofile
+        self.profiler: Optional[AnalysisProfiler] = None
+        self._clock: Optional[StageClock] = None
         self.analysis_results = {}
+        self.cache = AnalysisCache(cache_path) if cache_path else None
+        self.symbol_index_path = symbol_index_path
+        self.symbol_index: Optional['SymbolIndex'] = None
+        self.detect_duplicates = detect_duplicates
+        self.security_scanners = {
+            'python': SecurityScanner(PYTHON_SECURITY_RULES),
+            'javascript': SecurityScanner(JS_SECURITY_RULES),
+            'java': SecurityScanner(JAVA_SECURITY_RULES),
+            'html': SecurityScanner(HTML_SECURITY_RULES)
+        }
+    
+    def __getstate__(self):
+        # The cache and profiler live in the parent process only; workers never see them
+        state = self.__dict__.copy()
+        state['cache'] = None
+        state['profiler'] = None
+        state['_clock'] = None
+        state['insight_engine'] = None
+        state['symbol_index'] = None
+        return state
+    
+    def config_fingerprint(self) -> str:
+        """
+        Short hash of the settings that shape per-file results.
+        
+        Cached results are only reused under the same fingerprint, so changing
+        the size limits or security rules re-analyzes files instead of serving
+        results computed under the old settings.
+        """
+        config = {
+            'analyzer_version': ANALYZER_VERSION,
+            'large_file_bytes': self.large_file_bytes,
+            'max_file_bytes': self.max_file_bytes,
+            'security_rules': {language: [scanner.flags, scanner.rules]
+                               for language, scanner in sorted(self.security_scanners.items())}
+        }
+        return hashlib.sha256(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+    
+    def add_security_rules(self, language: str, rules: Dict[str, Dict[str, str]]):
+        """
+        Register additional security rules for a language.
+        
+        Args:
+            language: One of 'python', 'javascript', 'java' or 'html'
+            rules: Mapping of regex pattern to {'severity': ..., 'issue': ...}
+        """
+        self.security_scanners[language].add_rules(rules)
     
-    def analyze_repository(self, repo_path: str) -> Dict[str, Any]:
+    def analyze_repository(self, repo_path: str, workers: Optional[int] = 1) -> Dict[str, Any]:
         """
         Analyze entire repository comprehensively.
         
         Args:
             repo_path: Path to the repository
+            workers: Number of worker processes for per-file analysis
+                (1 runs serially, None uses every available CPU)
             
         Returns:
             Complete analysis results dictionary
         """
+        results = self._new_results(repo_path)
+        
+        # Analyze each file (merged in discovery order, serial or parallel)
+        summary = RunningSummary()
+        full_files = []
+        for file_analysis in self.iter_analyze_repository(repo_path, workers, summary=summary):
+            self._merge_file_analysis(results, file_analysis)
+            results['files_analyzed'] += 1
+            if not file_analysis.get('degraded'):
+                full_files.append((file_analysis['file_path'], file_analysis.get('functions', [])))
+        results['total_files'] = summary.total_files
+        
+        # Repository-wide duplicate code, reported as performance suggestions
+        if self.detect_duplicates:
+            duplicates_start = time.perf_counter()
+            results['clone_groups'] = self._detect_duplicate_code(full_files)
+            results['performance_suggestions'].extend(
+                self._duplicate_code_suggestion(group) for group in results['clone_groups']
+            )
+            if self.profiler:
+                self.profiler.add_stage('duplicates', time.perf_counter() - duplicates_start)
+        
+        # Generate AI insights if API key or engine available
+        if self.gemini_api_key or self.insight_engine:
+            results['ai_insights'] = self._generate_ai_insights(results)
+        
+        if self.cache:
+            results['cache_stats'] = self.cache.stats()
+        
+        if self.profiler:
+            results['profiling'] = self.profiler.report()
+        
+        # Calculate overall metrics
+        results['summary'] = self._calculate_summary_metrics(results)
+        
+        return results
+    
+    def _detect_duplicate_code(self, files: List[tuple]) -> List[Dict[str, Any]]:
+        """Fingerprint (file_path, function records) pairs and return their clone groups."""
+        from clone_detector import CloneDetector
+        detector = CloneDetector()
+        for file_path, functions in files:
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+            except (OSError, UnicodeDecodeError):
+                continue
+            detector.add_file(file_path, content, Path(file_path).suffix, functions)
+        groups = detector.clone_groups()
+        print(f"🧬 Duplicate code: {len(groups)} clone groups")
+        return groups
+    
+    def _duplicate_code_suggestion(self, group: Dict[str, Any]) -> Dict[str, Any]:
+        """Performance suggestion entry for one clone group."""
+        duplicated_tokens = group['tokens'] * (group['instances'] - 1)
+        return {
+            'type': 'duplicate_code',
+            'severity': 'medium' if duplicated_tokens >= 200 else 'low',
+            'suggestion': (f"Extract the ~{group['lines']}-line {group['kind']} duplicated in "
+                           f"{group['instances']} places into a shared function"),
+            'locations': [f"{location['file_path']}:{location['start_line']}-{location['end_line']}"
+                          for location in group['locations']]
+        }
+    
+    def watch(self, repo_path: str, poll_interval: float = 1.0, debounce: float = 0.3,
+              workers: Optional[int] = 1, on_update: Any = None) -> 'AnalysisWatcher':
+        """
+        Start watch mode: analyze the repository once, then keep it current.
+        
+        Changed files are re-analyzed in the background as they are saved; read
+        the latest report with watcher.current_report() and call watcher.stop()
+        when done.
+        
+        Args:
+            repo_path: Path to the repository
+            poll_interval: Seconds between change checks
+            debounce: Quiet period that ends a burst of saves
+            workers: Number of worker processes (see analyze_repository)
+            on_update: Optional callback receiving each new report
+            
+        Returns:
+            The running AnalysisWatcher
+        """
+        from analysis_watcher import AnalysisWatcher
+        return AnalysisWatcher(self, repo_path, poll_interval=poll_interval, debounce=debounce,
+                               workers=workers, on_update=on_update).start()
+    
+    def analyze_changes(self, repo_path: str, baseline_path: str, head_rev: str = 'HEAD',
+                        base_rev: Optional[str] = None, workers: Optional[int] = 1) -> Dict[str, Any]:
+        """
+        Analyze only the files changed between two git revisions.
+        
+        Per-file results for the whole tree are kept in a baseline file recorded
+        at a revision. Files added or modified since that revision are read
+        straight from git at head_rev (no checkout needed) and analyzed; removed
+        files are dropped. The baseline is then rewritten at head_rev. Without an
+        existing baseline every file at head_rev is analyzed once to create it.
+        
+        Args:
+            repo_path: Path to the git repository
+            baseline_path: JSON file holding the stored per-file baseline
+            head_rev: Revision to analyze
+            base_rev: Expected baseline revision; defaults to the one recorded in
+                the baseline and must match it when given
+            workers: Number of worker processes (see analyze_repository)
+            
+        Returns:
+            {'report': full analysis results at head_rev,
+             'delta': changed paths, their new analyses, count changes and the
+             'affected' files (changed files plus their transitive importers)}
+        """
+        head_sha = self._git(repo_path, 'rev-parse', '--verify', f"{head_rev}^{{commit}}").strip()
+        baseline = self._load_baseline(baseline_path)
+        
+        if baseline is None:
+            print(f"📥 No baseline found, analyzing every file at {head_sha[:12]}")
+            base_sha = None
+            previous = {}
+            listing = self._git(repo_path, 'ls-tree', '-r', '--name-only', '-z', head_sha)
+            added = [path for path in listing.split('\0') if path]
+            modified, removed = [], []
+        else:
+            previous = baseline['files']
+            base_sha = baseline['revision']
+            if base_rev is not None:
+                expected = self._git(repo_path, 'rev-parse', '--verify', f"{base_rev}^{{commit}}").strip()
+                if expected != base_sha:
+                    raise ValueError(f"Baseline is at {base_sha}, not {expected}")
+            added, modified, removed = self._git_changed_files(repo_path, base_sha, head_sha)
+        
+        rules = self._exclude_rules(repo_path)
+        added = [path for path in added if self._is_tracked_code_file(path, rules)]
+        modified = [path for path in modified if self._is_tracked_code_file(path, rules)]
+        removed = [path for path in removed if path in previous]
+        print(f"🔀 Changes: {len(added)} added, {len(modified)} modified, {len(removed)} removed")
+        
+        fresh = self._analyze_revision_files(repo_path, head_sha, added + modified, workers)
+        
+        # Count changes for the delta report before the baseline is updated
+        count_keys = ('functions', 'classes', 'security_issues')
+        before = {key: sum(len(previous[path].get(key, [])) for path in modified + removed)
+                  for key in count_keys}
+        after = {key: sum(len(analysis.get(key, [])) for analysis in fresh.values())
+                 for key in count_keys}
+        
+        current = dict(previous)
+        for path in removed:
+            current.pop(path, None)
+        for path in modified:
+            current.pop(path, None)
+        current.update(fresh)
+        self._save_baseline(baseline_path, head_sha, current)
+        
+        # Removed files rejoin the graph so their former importers count as affected
+        from import_graph import ImportGraph
+        graph = ImportGraph.from_analyses(current)
+        for path in removed:
+            graph.update_file(path, previous[path].get('imports', []))
+        affected = graph.affected_files(added + modified + removed) - set(removed)
+        
+        # Full report over the updated baseline, in path order
+        report = self._new_results(repo_path)
+        report['revision'] = head_sha
+        report['total_files'] = len(current)
+        for path in sorted(current):
+            self._merge_file_analysis(report, current[path])
+            report['files_analyzed'] += 1
+        report['summary'] = self._calculate_summary_metrics(report)
+        
+        delta = {
+            'base_revision': base_sha,
+            'head_revision': head_sha,
+            'added': [path for path in added if path in fresh],
+            'modified': [path for path in modified if path in fresh],
+            'removed': removed,
+            'files': [fresh[path] for path in added + modified if path in fresh],
+            'summary_change': {key: after[key] - before[key] for key in count_keys},
+            'affected': sorted(affected)
+        }
+        
+        return {'report': report, 'delta': delta}
+    
+    def _git(self, repo_path: str, *args: str) -> str:
+        """Run a git command in repo_path and return its stdout."""
+        import subprocess
+        try:
+            completed = subprocess.run(['git', '-C', repo_path, *args],
+                                       capture_output=True, text=True, check=True)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"git {' '.join(args)} failed: {e.stderr.strip()}") from e
+        return completed.stdout
+    
+    def _git_changed_files(self, repo_path: str, base_rev: str, head_rev: str) -> tuple:
+        """Return (added, modified, removed) paths between two revisions; renames count as remove + add."""
+        output = self._git(repo_path, 'diff', '--name-status', '--no-renames', '-z', base_rev, head_rev)
+        fields = output.split('\0')
+        added, modified, removed = [], [], []
+        for status, path in zip(fields[0::2], fields[1::2]):
+            if status == 'A':
+                added.append(path)
+            elif status == 'D':
+                removed.append(path)
+            elif status:
+                modified.append(path)
+        return added, modified, removed
+    
+    def _is_tracked_code_file(self, relative_path: str, rules: List[tuple]) -> bool:
+        """Apply the same suffix and exclusion rules as _find_code_files to a repo-relative path."""
+        if os.path.splitext(relative_path)[1] not in self.supported_extensions:
+            return False
+        parts = relative_path.split('/')
+        for depth, name in enumerate(parts[:-1], start=1):
+            if name in self.excluded_dirs:
+                return False
+            if rules and _is_excluded('/'.join(parts[:depth]), name, True, rules):
+                return False
+        return not (rules and _is_excluded(relative_path, parts[-1], False, rules))
+    
+    def _analyze_revision_files(self, repo_path: str, revision: str, paths: List[str],
+                                workers: Optional[int] = 1) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze files as they exist at a revision, keyed by repo-relative path.
+        
+        Blobs are fetched with a single `git cat-file --batch` call and written
+        to a scratch directory, so the working tree is never touched.
+        """
+        if not paths:
+            return {}
+        
+        import subprocess
+        import tempfile
+        
+        request = ''.join(f"{revision}:{path}\n" for path in paths).encode('utf-8')
+        completed = subprocess.run(['git', '-C', repo_path, 'cat-file', '--batch'],
+                                   input=request, capture_output=True, check=True)
+        output = completed.stdout
+        
+        with tempfile.TemporaryDirectory() as scratch:
+            scratch_files = {}
+            position = 0
+            for path in paths:
+                header_end = output.index(b'\n', position)
+                header = output[position:header_end].split()
+                position = header_end + 1
+                if header[-1] == b'missing':
+                    continue
+                size = int(header[2])
+                scratch_path = os.path.join(scratch, *path.split('/'))
+                os.makedirs(os.path.dirname(scratch_path), exist_ok=True)
+                with open(scratch_path, 'wb') as f:
+                    f.write(output[position:position + size])
+                position += size + 1
+                scratch_files[scratch_path] = path
+            
+            analyses = {}
+            scratch_paths = list(scratch_files)
+            for scratch_path, analysis in zip(scratch_paths, self._run_file_analyses(scratch_paths, workers)):
+                if analysis:
+                    analysis['file_path'] = scratch_files[scratch_path]
+                    analyses[scratch_files[scratch_path]] = analysis
+        
+        return analyses
+    
+    def _load_baseline(self, baseline_path: str) -> Optional[Dict[str, Any]]:
+        """Load a stored per-file baseline, or None if absent or from another analyzer version."""
+        try:
+            with open(baseline_path, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if baseline.get('analyzer_version') != ANALYZER_VERSION:
+            return None
+        
+        for analysis in baseline['files'].values():
+            if analysis.get('metrics') is not None:
+                analysis['metrics'] = CodeMetrics(**analysis['metrics'])
+            if self.compact_records:
+                self._compact_analysis(analysis)
+        return baseline
+    
+    def _save_baseline(self, baseline_path: str, revision: str, files: Dict[str, Dict[str, Any]]):
+        """Atomically write the per-file baseline recorded at revision."""
+        temp_path = f"{baseline_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'analyzer_version': ANALYZER_VERSION,
+                       'revision': revision,
+                       'files': files}, f, default=_to_jsonable)
+        os.replace(temp_path, baseline_path)
+    
+    def iter_analyze_repository(self, repo_path: str, workers: Optional[int] = 1,
+                                sink: Any = None, summary: Optional['RunningSummary'] = None):
+        """
+        Analyze a repository file by file, yielding each result as it completes.
+        
+        Nothing is accumulated across files, so peak memory does not grow with
+        repository size. Results are yielded in discovery order.
+        
+        Args:
+            repo_path: Path to the repository
+            workers: Number of worker processes (see analyze_repository)
+            sink: Optional JSONL destination, a file path or writable text handle;
+                one JSON object is written per analyzed file
+            summary: Optional RunningSummary updated incrementally as files complete
+            
+        Yields:
+            Per-file analysis dictionaries
+        """
         print(f"🔍 Starting comprehensive repository analysis...")
         print(f"📁 Repository path: {repo_path}")
         
-        results = {
-            'repository_path': repo_path,
-            'analysis_timestamp': datetime.now().isoformat(),
-            'files_analyzed': 0,
-            'total_files': 0,
-            'file_types': {},
-            'code_metrics': {},
-            'functions': [],
-            'classes': [],
-            'security_issues': [],
-            'performance_suggestions': [],
-            'documentation_quality': {},
-            'complexity_analysis': {},
-            'ai_insights': None
-        }
+        summary = summary if summary is not None else RunningSummary()
+        
+        # Profiling state is per run; see self.profiler afterwards
+        profiler = AnalysisProfiler(self.profile_top_n, self.use_cprofile) if self.profile else None
+        self.profiler = profiler
+        if profiler:
+            profiler.start()
+            walk_start = time.perf_counter()
         
         # Find all code files
         code_files = self._find_code_files(repo_path)
-        results['total_files'] = len(code_files)
+        summary.total_files = len(code_files)
+        if profiler:
+            profiler.add_stage('walk', time.perf_counter() - walk_start)
         
         print(f"📊 Found {len(code_files)} code files")
         
-        # Analyze each file
+        symbol_index = self._get_symbol_index(repo_path)
+        
+        owns_sink = isinstance(sink, (str, os.PathLike))
+        handle = open(sink, 'w', encoding='utf-8') if owns_sink else sink
+        try:
+            for file_analysis in self._iter_file_analyses(code_files, workers):
+                if not file_analysis:
+                    continue
+                if profiler and 'timings' in file_analysis:
+                    profiler.record_file(file_analysis['file_path'], file_analysis['timings'])
+                summary.add(file_analysis)
+                if symbol_index and not symbol_index.is_current(file_analysis['file_path']):
+                    symbol_index.update_file(file_analysis)
+                if handle is not None:
+                    handle.write(json.dumps(file_analysis, default=_to_jsonable) + "\n")
+                yield file_analysis
+        finally:
+            if owns_sink:
+                handle.close()
+            if profiler:
+                profiler.stop()
+        
+        # Persist cache updates
+        if self.cache:
+            self.cache.save()
+            stats = self.cache.stats()
+            print(f"💾 Cache: {stats['hits']} hits, {stats['misses']} misses")
+        
+        if symbol_index:
+            symbol_index.prune(code_files)
+            print(f"🗂️ Symbol index: {symbol_index.stats()['symbols']} symbols")
+        
+        print(f"✅ Analysis complete: {summary.files_analyzed}/{summary.total_files} files processed")
+    
+    def _get_symbol_index(self, repo_path: str) -> Optional['SymbolIndex']:
+        """Open the persistent symbol index for repo_path, if one is configured."""
+        if not self.symbol_index_path:
+            return None
+        if self.symbol_index is not None and self.symbol_index.repo_root != os.path.abspath(repo_path):
+            self.symbol_index.close()
+            self.symbol_index = None
+        if self.symbol_index is None:
+            from symbol_index import SymbolIndex
+            self.symbol_index = SymbolIndex(self.symbol_index_path, repo_path)
+        self.symbol_index.fingerprint = self.config_fingerprint()
+        return self.symbol_index
+    
+    def _iter_file_analyses(self, code_files: List[str], workers: Optional[int] = 1):
+        """
+        Yield per-file analyses in the same order as code_files.
+        
+        With more than one worker the files are analyzed in a process pool;
+        results are still yielded in input order so merging stays deterministic
+        and identical to the serial path. When a cache is configured only new or
+        modified files are analyzed; everything else is served from the cache.
+        """
+        if self.cache is None:
+            yield from self._run_file_analyses(code_files, workers)
+            return
+        
+        # Size limits and rules may have changed since the cache was written
+        self.cache.fingerprint = self.config_fingerprint()
+        misses = [file_path for file_path in code_files if not self.cache.has(file_path)]
+        miss_set = set(misses)
+        
+        fresh = self._run_file_analyses(misses, workers)
         for file_path in code_files:
-            try:
-                file_analysis = self._analyze_file(file_path)
-                if file_analysis:
-                    self._merge_file_analysis(results, file_analysis)
-                    results['files_analyzed'] += 1
-            except Exception as e:
-                print(f"⚠️ Error analyzing {file_path}: {str(e)}")
-        
-        # Generate AI insights if API key available
-        if self.gemini_api_key:
-            results['ai_insights'] = self._generate_ai_insights(results)
+            if file_path not in miss_set:
+                analysis = self.cache.get(file_path)
+                yield self._compact_analysis(analysis) if self.compact_records else analysis
+                continue
+            analysis = next(fresh)
+            if analysis:
+                self.cache.put(file_path, analysis)
+            yield analysis
+    
+    def _run_file_analyses(self, code_files: List[str], workers: Optional[int] = 1):
+        """
+        Analyze files serially or in a process pool, yielding in input order.
         
-        # Calculate overall metrics
-        results['summary'] = self._calculate_summary_metrics(results)
+        The pool is fed in batches with a bounded number in flight, so finished
+        results never pile up faster than the consumer takes them.
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(code_files))
         
-        print(f"✅ Analysis complete: {results['files_analyzed']}/{results['total_files']} files processed")
+        if workers <= 1:
+            for file_path in code_files:
+                yield _analyze_file_safely(self, file_path)
+            return
         
-        return results
+        # Imported here: the process pool pulls in multiprocessing, which most runs never need
+        from concurrent.futures import ProcessPoolExecutor
+        
+        print(f"⚙️ Analyzing with {workers} worker processes")
+        batch_size = max(1, min(len(code_files) // (workers * 4), 64))
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_analysis_worker,
+                                 initargs=(self,)) as executor:
+            for start in range(0, len(code_files), batch_size):
+                batch = code_files[start:start + batch_size]
+                pending.append(executor.submit(_analyze_files_in_worker, batch))
+                if len(pending) >= workers * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+    
+    def _compact_analysis(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert Python function/class dicts in a file analysis to slotted records."""
+        if analysis.get('file_type') == '.py':
+            analysis['functions'] = [FunctionInfo.from_dict(func) for func in analysis['functions']]
+            analysis['classes'] = [ClassInfo.from_dict(cls) for cls in analysis['classes']]
+        return analysis
+    
+    def export_results(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Return a copy of analysis results with every record in plain dict shape.
+        
+        Use this on results produced with compact_records=True before handing
+        them to code that expects the original dictionaries.
+        """
+        exported = dict(results)
+        exported['functions'] = [export_record(func) for func in results['functions']]
+        exported['classes'] = [export_record(cls) for cls in results['classes']]
+        return exported
+    
+    def _exclude_rules(self, root: str) -> List[tuple]:
+        """Compiled exclude rules from exclude_patterns and, optionally, root/.gitignore."""
+        patterns = list(self.exclude_patterns)
+        if self.use_gitignore:
+            patterns.extend(_read_gitignore(root))
+        return _compile_exclude_patterns(patterns)
     
     def _find_code_files(self, repo_path: str) -> List[str]:
-        """Find all supported code files in repository."""
-        code_files = []
-        repo_path = Path(repo_path)
+        """
+        Find all supported code files in repository.
         
-        for file_path in repo_path.rglob('*'):
-            if file_path.is_file() and file_path.suffix in self.supported_extensions:
-                # Skip common non-source directories
-                if any(skip in str(file_path) for skip in ['__pycache__', 'venv', '.git', 'node_modules', 'target', 'build']):
-                    continue
-                code_files.append(str(file_path))
+        Walks the tree with os.scandir, pruning excluded directories by name
+        before descending into them. exclude_patterns (and the repository's
+        .gitignore when use_gitignore is set) are applied to repo-relative paths.
+        Entries are visited in sorted order so discovery is deterministic.
+        """
+        root = os.path.normpath(repo_path)
+        rules = self._exclude_rules(root)
+        
+        code_files = []
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as it:
+                    entries = sorted(it, key=lambda entry: entry.name)
+            except OSError:
+                continue
+            
+            subdirectories = []
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name in self.excluded_dirs:
+                        continue
+                    if rules and _is_excluded(os.path.relpath(entry.path, root), entry.name, True, rules):
+                        continue
+                    subdirectories.append(entry.path)
+                elif os.path.splitext(entry.name)[1] in self.supported_extensions and entry.is_file():
+                    if rules and _is_excluded(os.path.relpath(entry.path, root), entry.name, False, rules):
+                        continue
+                    code_files.append(entry.path)
+            
+            # Reversed so subdirectories are popped in sorted order
+            stack.extend(reversed(subdirectories))
         
         return code_files
     
     def _analyze_file(self, file_path: str) -> Optional[Dict[str, Any]]:
-        """Analyze individual code file."""
+        """
+        Analyze individual code file.
+        
+        Files above max_file_bytes are skipped and files above large_file_bytes
+        only get a chunked, memory-mapped metrics pass; either way the record's
+        'degraded' field says so. With profiling enabled the record also carries
+        per-stage 'timings' in seconds.
+        """
+        clock = self._clock = StageClock() if self.profile else None
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
             file_ext = Path(file_path).suffix
             relative_path = os.path.relpath(file_path)
+            size_bytes = os.stat(file_path).st_size
             
             analysis = {
                 'file_path': relative_path,
                 'file_type': file_ext,
-                'size_bytes': len(content.encode('utf-8')),
-                'lines': len(content.splitlines()),
+                'size_bytes': size_bytes,
+                'lines': 0,
                 'metrics': None,
                 'functions': [],
                 'classes': [],
                 'imports': [],
                 'security_issues': [],
-                'complexity_indicators': []
+                'complexity_indicators': [],
+                'degraded': None
             }
             
+            # Large-file policy
+            if self.max_file_bytes is not None and size_bytes > self.max_file_bytes:
+                analysis['degraded'] = 'skipped'
+                return analysis
+            if self.large_file_bytes is not None and size_bytes > self.large_file_bytes:
+                analysis['degraded'] = 'metrics_only'
+                analysis['metrics'] = self._calculate_chunked_metrics(file_path)
+                analysis['lines'] = analysis['metrics'].total_lines
+                if clock:
+                    clock.lap('metrics')
+                    analysis['timings'] = clock.timings
+                return analysis
+            
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            if clock:
+                clock.lap('read')
+            
             # Language-specific analysis
             if file_ext == '.py':
                 analysis.update(self._analyze_python_file(content, file_path))
@@ -158,18 +1264,31 @@ class SmartCodeAnalyzer:
                 analysis.update(self._analyze_css_file(content, file_path))
             
             # Calculate basic metrics
-            analysis['metrics'] = self._calculate_basic_metrics(content)
+            analysis['metrics'] = self._calculate_basic_metrics(
+                content,
+                functions=len(analysis.get('functions', [])),
+                classes=len(analysis.get('classes', []))
+            )
+            analysis['lines'] = analysis['metrics'].total_lines
+            if clock:
+                clock.lap('metrics')
+                analysis['timings'] = clock.timings
             
             return analysis
             
         except Exception as e:
             print(f"❌ Error analyzing file {file_path}: {str(e)}")
             return None
+        finally:
+            self._clock = None
     
     def _analyze_python_file(self, content: str, file_path: str) -> Dict[str, Any]:
         """Analyze Python file specifically."""
+        clock = self._clock
         try:
             tree = ast.parse(content)
+            if clock:
+                clock.lap('parse')
             analysis = {
                 'functions': [],
                 'classes': [],
@@ -177,39 +1296,36 @@ class SmartCodeAnalyzer:
                 'complexity_score': 0
             }
             
-            # Extract imports
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        analysis['imports'].append(alias.name)
-                elif isinstance(node, ast.ImportFrom):
-                    module = node.module or ''
-                    for alias in node.names:
-                        analysis['imports'].append(f"{module}.{alias.name}")
-            
-            # Extract functions and classes
-            for node in ast.walk(tree):
-                if isinstance(node, ast.FunctionDef):
-                    func_info = self._extract_function_info(node, content)
-                    analysis['functions'].append(func_info)
-                    analysis['complexity_score'] += func_info['complexity']
-                
-                elif isinstance(node, ast.ClassDef):
-                    class_info = self._extract_class_info(node, content)
-                    analysis['classes'].append(class_info)
+            # Collect imports, functions, classes and complexity in one traversal
+            visitor = PythonStructureVisitor(self, content)
+            visitor.visit(tree)
+            analysis['imports'] = visitor.imports
+            analysis['functions'] = visitor.functions
+            analysis['classes'] = visitor.classes
+            analysis['complexity_score'] = visitor.complexity_score
+            if clock:
+                clock.lap('extract')
             
             # Security analysis
             analysis['security_issues'] = self._analyze_python_security(content)
+            if clock:
+                clock.lap('security')
             
             return analysis
             
         except SyntaxError as e:
+            if clock:
+                clock.lap('parse')
             return {'syntax_error': str(e), 'functions': [], 'classes': [], 'imports': []}
     
-    def _extract_function_info(self, node: ast.FunctionDef, content: str) -> Dict[str, Any]:
-        """Extract detailed function information."""
-        lines = content.splitlines()
+    def _extract_function_info(self, node: ast.FunctionDef, content: str,
+                               complexity: Optional[int] = None) -> Any:
+        """Extract detailed function information.
         
+        complexity may be supplied by a caller that has already counted the
+        function's branches; otherwise the function body is walked here.
+        Returns a FunctionInfo record in compact mode, otherwise its dict shape.
+        """
         # Get parameters
         parameters = []
         for arg in node.args.args:
@@ -219,10 +1335,11 @@ class SmartCodeAnalyzer:
         docstring = ast.get_docstring(node)
         
         # Calculate complexity (simplified cyclomatic complexity)
-        complexity = 1
-        for child in ast.walk(node):
-            if isinstance(child, (ast.If, ast.While, ast.For, ast.Try)):
-                complexity += 1
+        if complexity is None:
+            complexity = 1
+            for child in ast.walk(node):
+                if isinstance(child, PythonStructureVisitor.BRANCH_NODES):
+                    complexity += 1
         
         # Get decorators
         decorators = []
@@ -230,21 +1347,28 @@ class SmartCodeAnalyzer:
             if isinstance(decorator, ast.Name):
                 decorators.append(decorator.id)
             elif isinstance(decorator, ast.Attribute):
-                decorators.append(ast.unparse(decorator))
+                decorators.append(sys.intern(ast.unparse(decorator)))
         
-        return {
-            'name': node.name,
-            'line_number': node.lineno,
-            'parameters': parameters,
-            'docstring': docstring,
-            'complexity': complexity,
-            'decorators': decorators,
-            'has_docstring': docstring is not None,
-            'line_count': node.end_lineno - node.lineno + 1 if hasattr(node, 'end_lineno') else 0
-        }
+        # Identifier strings from the parser are already interned
+        info = FunctionInfo(
+            name=node.name,
+            line_number=node.lineno,
+            parameters=parameters,
+            docstring=docstring,
+            complexity=complexity,
+            decorators=decorators,
+            line_count=node.end_lineno - node.lineno + 1 if hasattr(node, 'end_lineno') else 0
+        )
+        return info if self.compact_records else info.to_dict()
     
-    def _extract_class_info(self, node: ast.ClassDef, content: str) -> Dict[str, Any]:
-        """Extract detailed class information."""
+    def _extract_class_info(self, node: ast.ClassDef, content: str,
+                            methods: Optional[List[Any]] = None) -> Any:
+        """Extract detailed class information.
+        
+        methods may be supplied by a caller that has already extracted the
+        class's methods; otherwise they are extracted here.
+        Returns a ClassInfo record in compact mode, otherwise its dict shape.
+        """
         # Get base classes
         base_classes = []
         for base in node.bases:
@@ -255,119 +1379,198 @@ class SmartCodeAnalyzer:
         docstring = ast.get_docstring(node)
         
         # Extract methods
-        methods = []
-        for item in node.body:
-            if isinstance(item, ast.FunctionDef):
-                method_info = self._extract_function_info(item, content)
-                methods.append(method_info)
+        if methods is None:
+            methods = []
+            for item in node.body:
+                if isinstance(item, ast.FunctionDef):
+                    method_info = self._extract_function_info(item, content)
+                    methods.append(method_info)
         
-        return {
-            'name': node.name,
-            'line_number': node.lineno,
-            'base_classes': base_classes,
-            'docstring': docstring,
-            'methods': methods,
-            'has_docstring': docstring is not None,
-            'method_count': len(methods)
-        }
+        info = ClassInfo(
+            name=node.name,
+            line_number=node.lineno,
+            methods=methods,
+            base_classes=base_classes,
+            docstring=docstring
+        )
+        return info if self.compact_records else info.to_dict()
     
-    def _calculate_basic_metrics(self, content: str) -> CodeMetrics:
-        """Calculate basic code metrics."""
-        lines = content.splitlines()
-        total_lines = len(lines)
+    def _count_metrics(self, text: str, carried: str = '', ends_mid_line: bool = False) -> Tuple[List[int], str]:
+        """
+        Count lines, complexity keywords and doc markers in a piece of text.
+        
+        Shared by _calculate_basic_metrics and _calculate_chunked_metrics so
+        both paths count the same way. Complexity keywords are matched as whole
+        words on code lines only, so 'diff' or a commented-out 'if' do not count.
+        carried is the leading text of a line left unfinished by the previous
+        chunk; it classifies the first line. When ends_mid_line is set the last
+        line is unfinished: it is not counted as a line here, and enough of its
+        leading text to classify it is returned for the next chunk.
+        Returns ([total, code, comment, blank, complexity, docstring markers], carry).
+        """
+        lines = text.splitlines()
+        first_line = lines[0] if lines else ''
+        if carried:
+            if lines:
+                lines[0] = carried + lines[0]
+            else:
+                lines = [carried]
+        carry = ''
+        partial_line = None
+        if ends_mid_line and lines:
+            partial_line = lines.pop()
+            # A comment prefix is at most two characters
+            carry = partial_line.lstrip()[:2]
         
         code_lines = 0
         comment_lines = 0
         blank_lines = 0
+        code = []
         
         for line in lines:
             stripped = line.strip()
             if not stripped:
                 blank_lines += 1
-            elif stripped.startswith('#') or stripped.startswith('//') or stripped.startswith('/*') or stripped.startswith('*'):
+            elif stripped.startswith(COMMENT_PREFIXES):
                 comment_lines += 1
             else:
                 code_lines += 1
+                code.append(line)
+        if partial_line is not None and not partial_line.lstrip().startswith(COMMENT_PREFIXES):
+            code.append(partial_line)
+        if carried and code:
+            # Keywords in the carried prefix were counted with the previous chunk
+            if lines and code[0] is lines[0]:
+                code[0] = first_line
+            elif code[0] is partial_line:
+                code[0] = partial_line[len(carried):]
         
-        # Simple complexity calculation
-        complexity_indicators = ['if', 'for', 'while', 'try', 'except', 'elif', 'else']
-        complexity_score = sum(content.count(indicator) for indicator in complexity_indicators)
-        
-        # Documentation coverage
-        docstring_count = content.count('"""') + content.count("'''") + content.count('/*')
-        documentation_coverage = (docstring_count / max(total_lines, 1)) * 100
+        complexity_score = len(COMPLEXITY_PATTERN.findall('\n'.join(code)))
+        docstring_count = sum(text.count(marker) for marker in DOCSTRING_MARKERS)
         
+        counts = [len(lines), code_lines, comment_lines, blank_lines, complexity_score, docstring_count]
+        return counts, carry
+    
+    def _metrics_from_counts(self, counts: List[int], functions: int = 0, classes: int = 0) -> CodeMetrics:
+        """Build CodeMetrics from the totals returned by _count_metrics."""
+        total_lines, code_lines, comment_lines, blank_lines, complexity_score, docstring_count = counts
         return CodeMetrics(
             total_lines=total_lines,
             code_lines=code_lines,
             comment_lines=comment_lines,
             blank_lines=blank_lines,
-            functions=0,  # Will be filled by language-specific analysis
-            classes=0,     # Will be filled by language-specific analysis
+            functions=functions,
+            classes=classes,
             complexity_score=complexity_score,
-            documentation_coverage=documentation_coverage
+            documentation_coverage=(docstring_count / max(total_lines, 1)) * 100
         )
     
-    def _analyze_python_security(self, content: str) -> List[Dict[str, Any]]:
-        """Analyze Python code for security issues."""
-        security_issues = []
+    def _calculate_basic_metrics(self, content: str, functions: int = 0, classes: int = 0) -> CodeMetrics:
+        """Calculate basic code metrics."""
+        counts, _ = self._count_metrics(content)
+        return self._metrics_from_counts(counts, functions, classes)
+    
+    def _calculate_chunked_metrics(self, file_path: str, chunk_size: int = 1024 * 1024) -> CodeMetrics:
+        """
+        Calculate basic metrics for a large file without reading it whole.
         
-        # Check for dangerous functions
-        dangerous_patterns = {
-            r'eval\s*\(': {'severity': 'high', 'issue': 'Use of eval() function'},
-            r'exec\s*\(': {'severity': 'high', 'issue': 'Use of exec() function'},
-            r'shell=True': {'severity': 'medium', 'issue': 'Shell injection risk'},
-            r'pickle\.loads?\s*\(': {'severity': 'medium', 'issue': 'Unsafe pickle usage'},
-            r'subprocess\.call': {'severity': 'low', 'issue': 'Subprocess usage without validation'},
-        }
+        The file is memory-mapped and processed in chunks cut at line
+        boundaries, so no keyword or marker is ever split across chunks. A
+        line longer than a whole chunk (minified or generated code) is cut
+        after a separator byte instead and counted once, with the chunk it
+        ends in. Each chunk is decoded incrementally and counted by
+        _count_metrics, so the totals match _calculate_basic_metrics.
+        """
+        import mmap
         
-        for pattern, info in dangerous_patterns.items():
-            if re.search(pattern, content, re.IGNORECASE):
-                security_issues.append({
-                    'type': 'security_vulnerability',
-                    'severity': info['severity'],
-                    'issue': info['issue'],
-                    'pattern': pattern
-                })
+        totals = [0] * 6
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
         
-        return security_issues
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    position = 0
+                    carry = ''
+                    while position < size:
+                        end = min(position + chunk_size, size)
+                        ends_mid_line = False
+                        if end < size:
+                            newline = mm.rfind(b'\n', position, end)
+                            if newline != -1:
+                                end = newline + 1
+                            else:
+                                window_start = max(position, end - 64 * 1024)
+                                cut = max(mm.rfind(separator, window_start, end) for separator in CHUNK_SEPARATORS)
+                                if cut != -1:
+                                    end = cut + 1
+                                ends_mid_line = True
+                        chunk = decoder.decode(mm[position:end], end == size)
+                        position = end
+                        
+                        counts, carry = self._count_metrics(chunk, carry, ends_mid_line)
+                        totals = [total + count for total, count in zip(totals, counts)]
+        
+        return self._metrics_from_counts(totals)
+    
+    def _analyze_python_security(self, content: str, line_index: Optional[LineIndex] = None) -> List[Dict[str, Any]]:
+        """Analyze Python code for security issues."""
+        return self.security_scanners['python'].scan(content, line_index)
     
     def _analyze_javascript_file(self, content: str, file_path: str) -> Dict[str, Any]:
         """Analyze JavaScript/TypeScript file."""
-        return {
-            'functions': self._extract_js_functions(content),
-            'classes': self._extract_js_classes(content),
-            'imports': self._extract_js_imports(content),
-            'security_issues': self._analyze_js_security(content)
+        line_index = LineIndex(content)
+        analysis = {
+            'functions': self._extract_js_functions(content, line_index),
+            'classes': self._extract_js_classes(content, line_index),
+            'imports': self._extract_js_imports(content)
         }
+        return self._add_security_issues(analysis, self._analyze_js_security, content, line_index)
     
     def _analyze_java_file(self, content: str, file_path: str) -> Dict[str, Any]:
         """Analyze Java file."""
-        return {
-            'functions': self._extract_java_methods(content),
-            'classes': self._extract_java_classes(content),
-            'imports': self._extract_java_imports(content),
-            'security_issues': self._analyze_java_security(content)
+        line_index = LineIndex(content)
+        analysis = {
+            'functions': self._extract_java_methods(content, line_index),
+            'classes': self._extract_java_classes(content, line_index),
+            'imports': self._extract_java_imports(content)
         }
+        return self._add_security_issues(analysis, self._analyze_java_security, content, line_index)
     
     def _analyze_html_file(self, content: str, file_path: str) -> Dict[str, Any]:
         """Analyze HTML file."""
-        return {
+        line_index = LineIndex(content)
+        analysis = {
             'tags': self._extract_html_tags(content),
-            'forms': self._extract_html_forms(content),
-            'security_issues': self._analyze_html_security(content)
+            'forms': self._extract_html_forms(content, line_index)
         }
+        return self._add_security_issues(analysis, self._analyze_html_security, content, line_index)
     
     def _analyze_css_file(self, content: str, file_path: str) -> Dict[str, Any]:
         """Analyze CSS file."""
-        return {
+        analysis = {
             'selectors': self._extract_css_selectors(content),
             'properties': self._extract_css_properties(content),
             'security_issues': []  # CSS typically has fewer security issues
         }
+        if self._clock:
+            self._clock.lap('extract')
+        return analysis
     
-    def _extract_js_functions(self, content: str) -> List[Dict[str, Any]]:
+    def _add_security_issues(self, analysis: Dict[str, Any], scan, content: str,
+                             line_index: LineIndex) -> Dict[str, Any]:
+        """Run a security scan after extraction, charging both to their profiling stages."""
+        clock = self._clock
+        if clock:
+            clock.lap('extract')
+        analysis['security_issues'] = scan(content, line_index)
+        if clock:
+            clock.lap('security')
+        return analysis
+    
+    def _extract_js_functions(self, content: str, line_index: Optional[LineIndex] = None) -> List[Dict[str, Any]]:
         """Extract JavaScript functions."""
+        line_index = line_index or LineIndex(content)
         functions = []
         pattern = r'(?:function\s+(\w+)\s*\(|(\w+)\s*:\s*function|const\s+(\w+)\s*=\s*(?:async\s+)?function)'
         matches = re.finditer(pattern, content)
@@ -378,13 +1581,14 @@ class SmartCodeAnalyzer:
                 functions.append({
                     'name': func_name,
                     'type': 'function',
-                    'line_number': content[:match.start()].count('\n') + 1
+                    'line_number': line_index.line_number(match.start())
                 })
         
         return functions
     
-    def _extract_js_classes(self, content: str) -> List[Dict[str, Any]]:
+    def _extract_js_classes(self, content: str, line_index: Optional[LineIndex] = None) -> List[Dict[str, Any]]:
         """Extract JavaScript classes."""
+        line_index = line_index or LineIndex(content)
         classes = []
         pattern = r'class\s+(\w+)(?:\s+extends\s+(\w+))?'
         matches = re.finditer(pattern, content)
@@ -393,7 +1597,7 @@ class SmartCodeAnalyzer:
             classes.append({
                 'name': match.group(1),
                 'base_classes': [match.group(2)] if match.group(2) else [],
-                'line_number': content[:match.start()].count('\n') + 1
+                'line_number': line_index.line_number(match.start())
             })
         
         return classes
@@ -413,29 +1617,13 @@ class SmartCodeAnalyzer:
         
         return list(set(imports))
     
-    def _analyze_js_security(self, content: str) -> List[Dict[str, Any]]:
+    def _analyze_js_security(self, content: str, line_index: Optional[LineIndex] = None) -> List[Dict[str, Any]]:
         """Analyze JavaScript security issues."""
-        security_issues = []
-        
-        dangerous_patterns = {
-            r'eval\s*\(': {'severity': 'high', 'issue': 'Use of eval()'},
-            r'innerHTML\s*=': {'severity': 'medium', 'issue': 'Potential XSS vulnerability'},
-            r'document\.write': {'severity': 'medium', 'issue': 'Potential XSS vulnerability'},
-            r'setTimeout\s*\(\s*["\']': {'severity': 'low', 'issue': 'String in setTimeout'}
-        }
-        
-        for pattern, info in dangerous_patterns.items():
-            if re.search(pattern, content, re.IGNORECASE):
-                security_issues.append({
-                    'type': 'security_vulnerability',
-                    'severity': info['severity'],
-                    'issue': info['issue']
-                })
-        
-        return security_issues
+        return self.security_scanners['javascript'].scan(content, line_index)
     
-    def _extract_java_methods(self, content: str) -> List[Dict[str, Any]]:
+    def _extract_java_methods(self, content: str, line_index: Optional[LineIndex] = None) -> List[Dict[str, Any]]:
         """Extract Java methods."""
+        line_index = line_index or LineIndex(content)
         methods = []
         pattern = r'(?:public|private|protected)?\s*(?:static)?\s*(?:\w+\s+)*(\w+)\s*\([^)]*\)\s*(?:throws\s+[\w\s,]+)?\s*\{'
         matches = re.finditer(pattern, content)
@@ -444,13 +1632,14 @@ class SmartCodeAnalyzer:
             methods.append({
                 'name': match.group(1),
                 'type': 'method',
-                'line_number': content[:match.start()].count('\n') + 1
+                'line_number': line_index.line_number(match.start())
             })
         
         return methods
     
-    def _extract_java_classes(self, content: str) -> List[Dict[str, Any]]:
+    def _extract_java_classes(self, content: str, line_index: Optional[LineIndex] = None) -> List[Dict[str, Any]]:
         """Extract Java classes."""
+        line_index = line_index or LineIndex(content)
         classes = []
         pattern = r'(?:public\s+)?(?:abstract\s+)?(?:final\s+)?class\s+(\w+)(?:\s+extends\s+(\w+))?(?:\s+implements\s+([\w\s,]+))?'
         matches = re.finditer(pattern, content)
@@ -460,7 +1649,7 @@ class SmartCodeAnalyzer:
                 'name': match.group(1),
                 'base_classes': [match.group(2)] if match.group(2) else [],
                 'interfaces': [i.strip() for i in match.group(3).split(',')] if match.group(3) else [],
-                'line_number': content[:match.start()].count('\n') + 1
+                'line_number': line_index.line_number(match.start())
             })
         
         return classes
@@ -470,33 +1659,18 @@ class SmartCodeAnalyzer:
         pattern = r'import\s+(?:static\s+)?([\w\.\*]+);'
         return re.findall(pattern, content)
     
-    def _analyze_java_security(self, content: str) -> List[Dict[str, Any]]:
+    def _analyze_java_security(self, content: str, line_index: Optional[LineIndex] = None) -> List[Dict[str, Any]]:
         """Analyze Java security issues."""
-        security_issues = []
-        
-        dangerous_patterns = {
-            r'Runtime\.getRuntime\(\)\.exec': {'severity': 'high', 'issue': 'Command execution'},
-            r'Class\.forName\s*\(': {'severity': 'medium', 'issue': 'Reflection usage'},
-            r'System\.getProperty': {'severity': 'low', 'issue': 'System property access'}
-        }
-        
-        for pattern, info in dangerous_patterns.items():
-            if re.search(pattern, content, re.IGNORECASE):
-                security_issues.append({
-                    'type': 'security_vulnerability',
-                    'severity': info['severity'],
-                    'issue': info['issue']
-                })
-        
-        return security_issues
+        return self.security_scanners['java'].scan(content, line_index)
     
     def _extract_html_tags(self, content: str) -> List[str]:
         """Extract HTML tags."""
         pattern = r'<(\w+)(?:\s+[^>]*)?>'
         return list(set(re.findall(pattern, content)))
     
-    def _extract_html_forms(self, content: str) -> List[Dict[str, Any]]:
+    def _extract_html_forms(self, content: str, line_index: Optional[LineIndex] = None) -> List[Dict[str, Any]]:
         """Extract HTML forms."""
+        line_index = line_index or LineIndex(content)
         forms = []
         pattern = r'<form[^>]*>(.*?)</form>'
         matches = re.finditer(pattern, content, re.DOTALL | re.IGNORECASE)
@@ -506,30 +1680,14 @@ class SmartCodeAnalyzer:
             inputs = re.findall(r'<input[^>]*>', form_content, re.IGNORECASE)
             forms.append({
                 'input_count': len(inputs),
-                'line_number': content[:match.start()].count('\n') + 1
+                'line_number': line_index.line_number(match.start())
             })
         
         return forms
     
-    def _analyze_html_security(self, content: str) -> List[Dict[str, Any]]:
+    def _analyze_html_security(self, content: str, line_index: Optional[LineIndex] = None) -> List[Dict[str, Any]]:
         """Analyze HTML security issues."""
-        security_issues = []
-        
-        dangerous_patterns = {
-            r'javascript:': {'severity': 'high', 'issue': 'JavaScript protocol'},
-            r'<script[^>]*>': {'severity': 'medium', 'issue': 'Script tag usage'},
-            r'onclick\s*=': {'severity': 'low', 'issue': 'Inline event handler'}
-        }
-        
-        for pattern, info in dangerous_patterns.items():
-            if re.search(pattern, content, re.IGNORECASE):
-                security_issues.append({
-                    'type': 'security_vulnerability',
-                    'severity': info['severity'],
-                    'issue': info['issue']
-                })
-        
-        return security_issues
+        return self.security_scanners['html'].scan(content, line_index)
     
     def _extract_css_selectors(self, content: str) -> List[str]:
         """Extract CSS selectors."""
@@ -541,6 +1699,26 @@ class SmartCodeAnalyzer:
         pattern = r'([a-zA-Z-]+)\s*:'
         return list(set(re.findall(pattern, content)))
     
+    def _new_results(self, repo_path: str) -> Dict[str, Any]:
+        """Empty repository-level results dictionary."""
+        return {
+            'repository_path': repo_path,
+            'analysis_timestamp': datetime.now().isoformat(),
+            'files_analyzed': 0,
+            'total_files': 0,
+            'file_types': {},
+            'code_metrics': {},
+            'functions': [],
+            'classes': [],
+            'security_issues': [],
+            'degraded_files': [],
+            'performance_suggestions': [],
+            'documentation_quality': {},
+            'complexity_analysis': {},
+            'directories': {},
+            'ai_insights': None
+        }
+    
     def _merge_file_analysis(self, results: Dict[str, Any], file_analysis: Dict[str, Any]):
         """Merge individual file analysis into overall results."""
         file_ext = file_analysis['file_type']
@@ -548,45 +1726,42 @@ class SmartCodeAnalyzer:
         
         results['functions'].extend(file_analysis.get('functions', []))
         results['classes'].extend(file_analysis.get('classes', []))
-        results['security_issues'].extend(file_analysis.get('security_issues', []))
+        results['security_issues'].extend(
+            {**issue, 'file_path': file_analysis['file_path']}
+            for issue in file_analysis.get('security_issues', [])
+        )
+        
+        directory = os.path.dirname(file_analysis['file_path']) or '.'
+        stats = results['directories'].setdefault(directory, {
+            'files': 0, 'file_types': {}, 'functions': 0, 'classes': 0, 'security_issues': 0
+        })
+        stats['files'] += 1
+        stats['file_types'][file_ext] = stats['file_types'].get(file_ext, 0) + 1
+        stats['functions'] += len(file_analysis.get('functions', []))
+        stats['classes'] += len(file_analysis.get('classes', []))
+        stats['security_issues'] += len(file_analysis.get('security_issues', []))
+        
+        if file_analysis.get('degraded'):
+            results['degraded_files'].append({
+                'file_path': file_analysis['file_path'],
+                'size_bytes': file_analysis['size_bytes'],
+                'mode': file_analysis['degraded']
+            })
     
     def _generate_ai_insights(self, results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Generate AI-powered insights using Gemini API."""
+        """
+        Generate AI-powered insights using Gemini API.
+        
+        Repository and per-directory prompts run concurrently through one
+        InsightEngine, created on first use and reused for later analyses.
+        """
+        if self.insight_engine is None:
+            # Imported here so asyncio is only loaded when insights are requested
+            from ai_insights import InsightEngine
+            self.insight_engine = InsightEngine(api_key=self.gemini_api_key)
+        
         try:
-            import google.generativeai as genai
-            genai.configure(api_key=self.gemini_api_key)
-            model = genai.GenerativeModel("gemini-2.5-flash")
-            
-            # Prepare analysis summary for AI
-            summary = {
-                'total_files': results['files_analyzed'],
-                'file_types': results['file_types'],
-                'total_functions': len(results['functions']),
-                'total_classes': len(results['classes']),
-                'security_issues_count': len(results['security_issues'])
-            }
-            
-            prompt = f"""
-            Analyze this code repository summary and provide insights:
-            
-            {json.dumps(summary, indent=2)}
-            
-            Provide insights on:
-            1. Code quality assessment
-            2. Security recommendations
-            3. Performance suggestions
-            4. Documentation improvements
-            5. Best practices recommendations
-            
-            Respond with JSON format.
-            """
-            
-            response = model.generate_content(prompt)
-            return {
-                'ai_insights': response.text,
-                'generated_at': datetime.now().isoformat()
-            }
-            
+            return self.insight_engine.generate(results)
         except Exception as e:
             print(f"⚠️ AI insights generation failed: {str(e)}")
             return None
@@ -598,49 +1773,209 @@ class SmartCodeAnalyzer:
             'total_functions_found': len(results['functions']),
             'total_classes_found': len(results['classes']),
             'total_security_issues': len(results['security_issues']),
+            'total_degraded_files': len(results['degraded_files']),
             'most_common_file_type': max(results['file_types'].items(), key=lambda x: x[1])[0] if results['file_types'] else None,
             'analysis_quality': 'high' if results['files_analyzed'] > 0 else 'low',
             'has_ai_insights': results['ai_insights'] is not None
         }
     
-    def generate_analysis_report(self, results: Dict[str, Any]) -> str:
-        """Generate comprehensive analysis report."""
-        report = []
-        report.append("# 🔍 Smart Code Analysis Report")
-        report.append(f"Generated: {results['analysis_timestamp']}")
-        report.append(f"Repository: {results['repository_path']}")
-        report.append("")
+    def generate_analysis_report(self, results: Dict[str, Any],
+                                 max_security_issues: Optional[int] = None) -> str:
+        """Generate comprehensive analysis report (see write_analysis_report)."""
+        buffer = io.StringIO()
+        self.write_analysis_report(results, buffer, max_security_issues)
+        return buffer.getvalue()
+    
+    def write_analysis_report(self, results: Dict[str, Any], handle: Any,
+                              max_security_issues: Optional[int] = None):
+        """
+        Stream the Markdown analysis report to a writable text handle.
+        
+        Lines are written as they are produced instead of being collected, so
+        every security issue can be listed without building the report in memory.
+        
+        Args:
+            results: Analysis results from analyze_repository
+            handle: Writable text file handle
+            max_security_issues: Optional cap on listed issues; all are listed by default
+        """
+        def write(line: str = ""):
+            handle.write(line + "\n")
+        
+        write("# 🔍 Smart Code Analysis Report")
+        write(f"Generated: {results['analysis_timestamp']}")
+        write(f"Repository: {results['repository_path']}")
+        write()
         
         # Summary
         summary = results['summary']
-        report.append("## 📊 Summary")
-        report.append(f"- **Files Analyzed:** {summary['total_files_analyzed']}")
-        report.append(f"- **Functions Found:** {summary['total_functions_found']}")
-        report.append(f"- **Classes Found:** {summary['total_classes_found']}")
-        report.append(f"- **Security Issues:** {summary['total_security_issues']}")
-        report.append(f"- **Most Common File Type:** {summary['most_common_file_type']}")
-        report.append("")
+        write("## 📊 Summary")
+        write(f"- **Files Analyzed:** {summary['total_files_analyzed']}")
+        write(f"- **Functions Found:** {summary['total_functions_found']}")
+        write(f"- **Classes Found:** {summary['total_classes_found']}")
+        write(f"- **Security Issues:** {summary['total_security_issues']}")
+        write(f"- **Most Common File Type:** {summary['most_common_file_type']}")
+        write()
         
         # File types
-        report.append("## 📁 File Types")
+        write("## 📁 File Types")
         for file_type, count in results['file_types'].items():
-            report.append(f"- **{file_type}:** {count} files")
-        report.append("")
+            write(f"- **{file_type}:** {count} files")
+        write()
         
-        # Security issues
+        # Security issues, most severe first
         if results['security_issues']:
-            report.append("## 🚨 Security Issues")
-            for issue in results['security_issues'][:5]:  # Show top 5
-                report.append(f"- **{issue.get('severity', 'unknown').upper()}:** {issue.get('issue', 'Unknown issue')}")
-            report.append("")
+            write("## 🚨 Security Issues")
+            issues = sorted(results['security_issues'],
+                            key=lambda issue: SEVERITY_ORDER.get(issue.get('severity'), len(SEVERITY_ORDER)))
+            for issue in issues[:max_security_issues]:
+                location = f" (`{issue['file_path']}:{issue['line_number']}`)" if 'line_number' in issue else ""
+                write(f"- **{issue.get('severity', 'unknown').upper()}:** {issue.get('issue', 'Unknown issue')}{location}")
+            if max_security_issues is not None and len(issues) > max_security_issues:
+                write(f"- ...and {len(issues) - max_security_issues} more")
+            write()
+        
+        # Duplicate code and other performance suggestions
+        if results.get('performance_suggestions'):
+            write("## 🧬 Performance Suggestions")
+            for suggestion in results['performance_suggestions']:
+                write(f"- **{suggestion['severity'].upper()}:** {suggestion['suggestion']}")
+                for location in suggestion.get('locations', []):
+                    write(f"  - `{location}`")
+            write()
+        
+        # Large files that only received partial analysis
+        if results.get('degraded_files'):
+            write("## 🐘 Large Files (Degraded Analysis)")
+            for degraded in results['degraded_files']:
+                write(f"- `{degraded['file_path']}` ({degraded['size_bytes']} bytes): {degraded['mode']}")
+            write()
+        
+        # Profiling
+        if results.get('profiling'):
+            profiling = results['profiling']
+            write("## ⏱️ Performance Profile")
+            for stage, seconds in profiling['stage_seconds'].items():
+                write(f"- **{stage}:** {seconds * 1000:.1f} ms")
+            if profiling['slowest_files']:
+                write()
+                write(f"Slowest {len(profiling['slowest_files'])} files:")
+                for entry in profiling['slowest_files']:
+                    write(f"- `{entry['file_path']}`: {entry['seconds'] * 1000:.1f} ms")
+            write()
         
         # AI Insights
         if results['ai_insights']:
-            report.append("## 🤖 AI Insights")
-            report.append(results['ai_insights'].get('ai_insights', 'No insights available'))
-            report.append("")
+            write("## 🤖 AI Insights")
+            write(results['ai_insights'].get('ai_insights', 'No insights available'))
+            write()
+            for directory, outcome in results['ai_insights'].get('directory_insights', {}).items():
+                if outcome['status'] == 'success':
+                    write(f"### `{directory}`")
+                    write(outcome['text'])
+                    write()
+
+def _analyze_file_safely(analyzer: SmartCodeAnalyzer, file_path: str) -> Optional[Dict[str, Any]]:
+    """Analyze one file, reporting failures instead of raising."""
+    try:
+        return analyzer._analyze_file(file_path)
+    except Exception as e:
+        print(f"⚠️ Error analyzing {file_path}: {str(e)}")
+        return None
+
+# Analyzer instance owned by each pool worker process
+_worker_analyzer: Optional[SmartCodeAnalyzer] = None
+
+def _init_analysis_worker(analyzer: SmartCodeAnalyzer):
+    """Process pool initializer: keep one analyzer per worker."""
+    global _worker_analyzer
+    _worker_analyzer = analyzer
+
+def _analyze_files_in_worker(file_paths: List[str]) -> List[Optional[Dict[str, Any]]]:
+    """Process pool task: analyze a batch of files with the worker's analyzer."""
+    return [_analyze_file_safely(_worker_analyzer, file_path) for file_path in file_paths]
+
+def _read_gitignore(root: str) -> List[str]:
+    """Return the pattern lines of root/.gitignore, if any."""
+    try:
+        with open(os.path.join(root, '.gitignore'), 'r', encoding='utf-8') as f:
+            return f.read().splitlines()
+    except OSError:
+        return []
+
+def _compile_exclude_patterns(patterns: List[str]) -> List[tuple]:
+    """
+    Compile .gitignore-style patterns into (regex, directory_only, anchored) rules.
+    
+    Supported subset: blank lines and '#' comments are ignored, a trailing '/'
+    matches directories only, and a pattern containing '/' is matched against
+    the whole repo-relative path instead of the entry name. As in git, '*' and
+    '?' never match '/', so 'docs/*.md' does not exclude 'docs/a/b.md'; '**'
+    spans directories. Negation ('!') is not supported and such lines are skipped.
+    """
+    rules = []
+    for pattern in patterns:
+        pattern = pattern.strip()
+        if not pattern or pattern.startswith('#') or pattern.startswith('!'):
+            continue
+        
+        directory_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+        anchored = '/' in pattern
+        pattern = pattern.lstrip('/')
+        if pattern.startswith('**/'):
+            pattern, anchored = pattern[3:], '/' in pattern[3:]
         
-        return "\n".join(report)
+        rules.append((_glob_to_regex(pattern), directory_only, anchored))
+    return rules
+
+def _glob_to_regex(pattern: str) -> re.Pattern:
+    """Translate a gitignore glob into a regex where only '**' crosses '/'."""
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+        elif char == '*':
+            parts.append('[^/]*')
+            i += 1
+        elif char == '?':
+            parts.append('[^/]')
+            i += 1
+        elif char == '[' and ']' in pattern[i + 2:]:
+            end = pattern.index(']', i + 2)
+            body = pattern[i + 1:end].replace('\\', '\\\\')
+            if body.startswith('!'):
+                body = '^' + body[1:]
+            parts.append(f'[{body}]')
+            i = end + 1
+        else:
+            parts.append(re.escape(char))
+            i += 1
+    return re.compile(''.join(parts) + r'\Z')
+
+def _is_excluded(relative_path: str, name: str, is_dir: bool, rules: List[tuple]) -> bool:
+    """Check a repo-relative path against compiled exclude rules."""
+    relative_path = relative_path.replace(os.sep, '/')
+    for regex, directory_only, anchored in rules:
+        if directory_only and not is_dir:
+            continue
+        if regex.match(relative_path if anchored else name):
+            return True
+    return False
+
+def _to_jsonable(obj: Any) -> Any:
+    """json.dumps default hook for analysis records."""
+    if isinstance(obj, CodeMetrics):
+        return asdict(obj)
+    if isinstance(obj, (FunctionInfo, ClassInfo)):
+        return obj.to_dict()
+    return str(obj)
 
 # Example usage and testing
 if __name__ == "__main__":
@@ -672,7 +2007,7 @@ if __name__ == "__main__":
     
     # Save report to file
     with open("code_analysis_report.md", "w", encoding="utf-8") as f:
-        f.write(report)
+        analyzer.write_analysis_report(results, f)
     
     print("\n💾 Report saved to: code_analysis_report.md")
     print("🎉 Analysis complete!")
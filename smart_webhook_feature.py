@@ -4,35 +4,234 @@ This module demonstrates the webhook-based documentation system functionality.
 """
 
 import json
+import time
+import hmac
 import hashlib
+import posixpath
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, List, Any, Optional, Callable, Iterable, Mapping, Union
+
+SIGNATURE_HEADER = 'X-Hub-Signature-256'
+SIGNATURE_PREFIX = 'sha256='
+
+# File types whose changes can affect generated documentation
+DOCUMENTATION_EXTENSIONS = frozenset({'.py', '.js', '.ts', '.java', '.html', '.css', '.md'})
+
+class PushChangeSet:
+    """
+    Net file changes of a sequence of commits, relative to the state before the first.
+    
+    Commits are folded in order (oldest first, as GitHub lists them): a file
+    added and later removed cancels out, a file removed and re-added counts
+    as modified, and a file added then modified stays added. Each path is a
+    single dict entry, so folding is linear in the number of paths touched.
+    """
+    
+    def __init__(self, commits: Iterable[Dict[str, Any]] = ()):
+        self._status: Dict[str, str] = {}
+        self.commit_count = 0
+        for commit in commits:
+            self.add_commit(commit)
+    
+    def add_commit(self, commit: Dict[str, Any]):
+        """Fold one commit's added/modified/removed lists into the net change set."""
+        status = self._status
+        for path in commit.get('added', []):
+            previous = status.get(path)
+            if previous is None:
+                status[path] = 'added'
+            elif previous == 'removed':
+                status[path] = 'modified'
+        for path in commit.get('modified', []):
+            if status.get(path) != 'added':
+                status[path] = 'modified'
+        for path in commit.get('removed', []):
+            if status.get(path) == 'added':
+                del status[path]
+            else:
+                status[path] = 'removed'
+        self.commit_count += 1
+    
+    def _paths(self, wanted: str) -> List[str]:
+        return [path for path, status in self._status.items() if status == wanted]
+    
+    @property
+    def added(self) -> List[str]:
+        return self._paths('added')
+    
+    @property
+    def modified(self) -> List[str]:
+        return self._paths('modified')
+    
+    @property
+    def removed(self) -> List[str]:
+        return self._paths('removed')
+    
+    def __len__(self) -> int:
+        return len(self._status)
+    
+    def relevant(self, extensions: frozenset = DOCUMENTATION_EXTENSIONS) -> Dict[str, List[str]]:
+        """Net changes limited to paths whose extension is in extensions (one set lookup per path)."""
+        relevant = {'added': [], 'modified': [], 'removed': []}
+        for path, status in self._status.items():
+            if posixpath.splitext(path)[1] in extensions:
+                relevant[status].append(path)
+        return relevant
+
+class DedupStore:
+    """
+    Bounded set of recently seen keys with LRU and TTL eviction.
+    
+    Lookups and inserts are O(1). Keys expire ttl_seconds after they were
+    last seen, and the least recently seen key is evicted once max_entries
+    is reached, so memory stays flat however many webhooks arrive.
+    """
+    
+    def __init__(self, max_entries: int = 10000, ttl_seconds: Optional[float] = 24 * 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _expire(self, now: float):
+        """Drop expired keys; the oldest are always at the front."""
+        if self.ttl_seconds is None:
+            return
+        cutoff = now - self.ttl_seconds
+        while self._entries:
+            key, seen_at = next(iter(self._entries.items()))
+            if seen_at >= cutoff:
+                break
+            del self._entries[key]
+    
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            self._expire(time.monotonic())
+            return key in self._entries
+    
+    def add_if_absent(self, *keys: str) -> bool:
+        """
+        Record keys unless any of them was already seen.
+        
+        Returns:
+            True if the keys were new and are now recorded, False for a duplicate
+            (a duplicate key is refreshed as most recently seen)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            duplicate = False
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self._entries[key] = now
+                    duplicate = True
+            if duplicate:
+                return False
+            for key in keys:
+                self._entries[key] = now
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+    
+    def discard(self, *keys: str):
+        """Forget keys, e.g. so a failed delivery can be retried."""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
 
 class WebhookProcessor:
     """
     Processes GitHub webhooks for automatic documentation updates.
+    
+    Deliveries are deduplicated by GitHub delivery ID and by repository and
+    commit SHA, so redeliveries and retries never trigger a second
+    documentation run. Only the most recent max_history results are kept in
+    processed_commits. When doc_scheduler is set, documentation updates are
+    handed to it (debounced and coalesced per repository) instead of being
+    generated inline.
+    
+    webhook_secret may be a list of secrets to rotate keys without downtime:
+    a signature made with any of them is accepted.
     """
     
-    def __init__(self, webhook_secret: str):
-        self.webhook_secret = webhook_secret
-        self.processed_commits = []
+    def __init__(self, webhook_secret: Union[str, bytes, List[Union[str, bytes]]],
+                 max_tracked_deliveries: int = 10000,
+                 dedup_ttl_seconds: Optional[float] = 24 * 3600, max_history: int = 100):
+        self.set_webhook_secrets(webhook_secret)
+        self.processed_commits = deque(maxlen=max_history)
+        self.seen_deliveries = DedupStore(max_tracked_deliveries, dedup_ttl_seconds)
+        self.doc_scheduler: Optional['DocumentationJobScheduler'] = None
     
-    def verify_webhook_signature(self, payload: str, signature: str) -> bool:
+    def set_webhook_secrets(self, secrets: Union[str, bytes, List[Union[str, bytes]]]):
+        """
+        Replace the accepted webhook secrets.
+        
+        The keyed HMAC-SHA256 state for each secret is built once here and
+        copied per request, so verification only hashes the body.
+        
+        Args:
+            secrets: One secret or a list of secrets (e.g. [new, old] while rotating)
+        """
+        if isinstance(secrets, (str, bytes)):
+            secrets = [secrets]
+        keys = [secret.encode('utf-8') if isinstance(secret, str) else secret for secret in secrets]
+        if not keys:
+            raise ValueError("At least one webhook secret is required")
+        self.webhook_secret = secrets[0]
+        self._signers = [hmac.new(key, digestmod=hashlib.sha256) for key in keys]
+    
+    def verify_webhook_signature(self, payload: Union[bytes, str], signature: Optional[str]) -> bool:
         """
         Verify GitHub webhook signature for security.
         
         Args:
-            payload: The webhook payload body
-            signature: The X-Hub-Signature-256 header
-            
+            payload: The raw request body, exactly as received; re-serialized
+                JSON will not match the signature
+            signature: The X-Hub-Signature-256 header ('sha256=<hex digest>')
+        
         Returns:
-            True if signature is valid, False otherwise
+            True if signature is valid for any configured secret, False otherwise
+        """
+        if not signature or not signature.startswith(SIGNATURE_PREFIX):
+            return False
+        try:
+            received = bytes.fromhex(signature[len(SIGNATURE_PREFIX):])
+        except ValueError:
+            return False
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        
+        # Every secret is checked so timing does not reveal which one matched
+        valid = False
+        for signer in self._signers:
+            mac = signer.copy()
+            mac.update(payload)
+            valid |= hmac.compare_digest(mac.digest(), received)
+        return valid
+    
+    def verify_request(self, body: bytes, headers: Mapping[str, str]) -> bool:
         """
-        expected_signature = "sha256=" + hashlib.sha256(
-            (self.webhook_secret + payload).encode('utf-8')
-        ).hexdigest()
+        Verify a webhook request from its raw body and HTTP headers.
+        
+        Args:
+            body: The raw request body
+            headers: Request headers; the signature header is looked up case-insensitively
         
-        return hmac.compare_digest(expected_signature, signature)
+        Returns:
+            True if the X-Hub-Signature-256 header is present and valid
+        """
+        signature = headers.get(SIGNATURE_HEADER)
+        if signature is None:
+            wanted = SIGNATURE_HEADER.lower()
+            signature = next((value for name, value in headers.items() if name.lower() == wanted), None)
+        return self.verify_webhook_signature(body, signature)
     
     def analyze_commit_changes(self, commit_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -40,45 +239,57 @@ class WebhookProcessor:
         
         Args:
             commit_data: GitHub commit information
-            
+        
         Returns:
             Analysis results with change detection
         """
-        added_files = commit_data.get('added', [])
-        modified_files = commit_data.get('modified', [])
-        removed_files = commit_data.get('removed', [])
-        
-        # Check if documentation-relevant files changed
-        code_extensions = {'.py', '.js', '.ts', '.java', '.html', '.css', '.md'}
+        return self.analyze_push_changes([commit_data])
+    
+    def analyze_push_changes(self, commits: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Analyze the net changes of every commit in a push.
         
-        relevant_changes = []
+        Args:
+            commits: The push payload's commits, oldest first
         
-        for file_list in [added_files, modified_files]:
-            for file_path in file_list:
-                if any(file_path.endswith(ext) for ext in code_extensions):
-                    relevant_changes.append(file_path)
+        Returns:
+            Analysis results with change detection; relevant_files are the net
+            added and modified documentation-relevant files, and removing such
+            a file also counts as a relevant change
+        """
+        change_set = PushChangeSet(commits)
+        relevant = change_set.relevant()
+        relevant_files = relevant['added'] + relevant['modified']
         
         return {
-            'has_relevant_changes': len(relevant_changes) > 0,
-            'relevant_files': relevant_changes,
-            'total_changes': len(added_files) + len(modified_files) + len(removed_files),
+            'has_relevant_changes': bool(relevant_files or relevant['removed']),
+            'relevant_files': relevant_files,
+            'removed_relevant_files': relevant['removed'],
+            'added_files': change_set.added,
+            'modified_files': change_set.modified,
+            'removed_files': change_set.removed,
+            'commit_count': change_set.commit_count,
+            'total_changes': len(change_set),
             'analysis_timestamp': datetime.now().isoformat()
         }
     
-    def generate_documentation_update(self, repo_name: str, commit_hash: str) -> Dict[str, Any]:
+    def generate_documentation_update(self, repo_name: str, commit_hash: str,
+                                      changed_files: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         Generate documentation update for the repository.
         
         Args:
             repo_name: Name of the repository
             commit_hash: Git commit hash
-            
+            changed_files: Optional files whose changes prompted the update
+        
         Returns:
             Documentation update information
         """
         update_info = {
             'repo_name': repo_name,
             'commit_hash': commit_hash,
+            'source_files': changed_files or [],
             'update_type': 'automatic',
             'generated_at': datetime.now().isoformat(),
             'status': 'pending',
@@ -92,16 +303,22 @@ class WebhookProcessor:
         
         return update_info
     
-    def process_webhook_payload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    def process_webhook_payload(self, payload: Dict[str, Any], delivery_id: Optional[str] = None,
+                                received_at: Optional[float] = None) -> Dict[str, Any]:
         """
         Process incoming webhook payload and coordinate documentation update.
         
         Args:
             payload: GitHub webhook payload
-            
+            delivery_id: The X-GitHub-Delivery header, if available
+            received_at: time.monotonic() when the webhook was received; orders
+                pushes for doc_scheduler (defaults to now)
+        
         Returns:
-            Processing results
+            Processing results; {'status': 'duplicate', ...} for a delivery or
+            commit that was already processed
         """
+        dedup_keys = ()
         try:
             # Extract repository and commit information
             repo_data = payload.get('repository', {})
@@ -110,17 +327,37 @@ class WebhookProcessor:
             if not commits:
                 return {'status': 'no_commits', 'message': 'No commits found in webhook'}
             
-            latest_commit = commits[0]
+            # GitHub lists commits oldest first; the push's head is 'after'
+            head_commit = payload.get('head_commit') or commits[-1]
             repo_name = repo_data.get('name', 'unknown')
-            commit_hash = latest_commit.get('id', 'unknown')
+            commit_hash = payload.get('after') or head_commit.get('id', 'unknown')
+            
+            # Short-circuit redeliveries and retries before doing any work
+            dedup_keys = tuple(key for key in (
+                f"delivery:{delivery_id}" if delivery_id else None,
+                f"commit:{repo_data.get('full_name', repo_name)}:{commit_hash}" if commit_hash != 'unknown' else None
+            ) if key)
+            if dedup_keys and not self.seen_deliveries.add_if_absent(*dedup_keys):
+                return {
+                    'status': 'duplicate',
+                    'repo_name': repo_name,
+                    'commit_hash': commit_hash,
+                    'delivery_id': delivery_id,
+                    'processed_at': datetime.now().isoformat()
+                }
             
             # Analyze changes
-            analysis = self.analyze_commit_changes(latest_commit)
+            analysis = self.analyze_push_changes(commits)
             
             # Generate documentation update if needed
             doc_update = None
             if analysis['has_relevant_changes']:
-                doc_update = self.generate_documentation_update(repo_name, commit_hash)
+                if self.doc_scheduler:
+                    doc_update = self.doc_scheduler.schedule(repo_name, commit_hash, analysis['relevant_files'],
+                                                             received_at)
+                else:
+                    doc_update = self.generate_documentation_update(repo_name, commit_hash,
+                                                                    analysis['relevant_files'])
             
             # Record processing
             processing_result = {
@@ -135,14 +372,310 @@ class WebhookProcessor:
             self.processed_commits.append(processing_result)
             
             return processing_result
-            
+        
         except Exception as e:
+            # Let a retry of the failed delivery run again
+            self.seen_deliveries.discard(*dedup_keys)
             return {
                 'status': 'error',
                 'error_message': str(e),
                 'processed_at': datetime.now().isoformat()
             }
 
+@dataclass
+class WebhookJob:
+    """A webhook accepted for background processing"""
+    payload: Dict[str, Any]
+    delivery_id: Optional[str] = None
+    received_at: float = field(default_factory=time.monotonic)
+
+class WebhookIngestionQueue:
+    """
+    Acknowledges webhooks immediately and processes them in the background.
+    
+    submit() only validates and enqueues, so the HTTP handler answers within
+    milliseconds and GitHub never times out waiting for the pipeline. A pool
+    of asyncio workers drains the bounded queue, running the blocking
+    process_webhook_payload on the queue's own thread pool. A full queue
+    answers 429 and a queue that is not running answers 503, both with
+    Retry-After, so bursts push back on the sender instead of piling up.
+    
+    Must be started, submitted to and stopped from one running event loop.
+    asyncio is only imported once the queue starts, so importing this module
+    stays cheap for synchronous users of WebhookProcessor.
+    """
+    
+    def __init__(self, processor: WebhookProcessor, workers: int = 4, max_queue_size: int = 100,
+                 retry_after_seconds: int = 30, max_results: int = 100,
+                 on_result: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.processor = processor
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self.retry_after_seconds = retry_after_seconds
+        self.on_result = on_result
+        self.results = deque(maxlen=max_results)
+        self.stats = {'accepted': 0, 'rejected_full': 0, 'rejected_unavailable': 0,
+                      'duplicates': 0, 'processed': 0, 'failed': 0}
+        self.queue: Optional['asyncio.Queue'] = None
+        self._tasks = []
+        self._executor: Optional['ThreadPoolExecutor'] = None
+        self._accepting = False
+    
+    async def start(self):
+        """Create the queue and start the worker pool."""
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+        
+        self.queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='webhook')
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._accepting = True
+    
+    async def stop(self, drain: bool = True):
+        """
+        Stop accepting webhooks and shut the worker pool down.
+        
+        Args:
+            drain: Finish the jobs already queued before stopping
+        """
+        import asyncio
+        
+        self._accepting = False
+        if drain and self.queue is not None:
+            await self.queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+    
+    def submit(self, payload: Dict[str, Any], delivery_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Enqueue a webhook without waiting for it to be processed.
+        
+        Args:
+            payload: GitHub webhook payload
+            delivery_id: The X-GitHub-Delivery header, if available
+        
+        Returns:
+            HTTP response as {'status_code', 'body', 'headers'}: 202 when
+            queued, 200 for an already processed delivery, 429 when the queue
+            is full and 503 when the queue is not running
+        """
+        if not self._accepting:
+            self.stats['rejected_unavailable'] += 1
+            return self._response(503, {'status': 'unavailable', 'message': 'Webhook queue is not running'},
+                                  retry=True)
+        
+        if delivery_id and f"delivery:{delivery_id}" in self.processor.seen_deliveries:
+            self.stats['duplicates'] += 1
+            return self._response(200, {'status': 'duplicate', 'delivery_id': delivery_id})
+        
+        import asyncio
+        
+        try:
+            self.queue.put_nowait(WebhookJob(payload, delivery_id))
+        except asyncio.QueueFull:
+            self.stats['rejected_full'] += 1
+            return self._response(429, {'status': 'busy', 'message': 'Webhook queue is full'}, retry=True)
+        
+        self.stats['accepted'] += 1
+        return self._response(202, {'status': 'queued', 'delivery_id': delivery_id,
+                                    'queue_depth': self.queue.qsize()})
+    
+    def _response(self, status_code: int, body: Dict[str, Any], retry: bool = False) -> Dict[str, Any]:
+        headers = {'Retry-After': str(self.retry_after_seconds)} if retry else {}
+        return {'status_code': status_code, 'body': body, 'headers': headers}
+    
+    async def _worker(self):
+        """Take jobs off the queue and run the blocking pipeline on the thread pool."""
+        import asyncio
+        
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            dequeued_at = time.monotonic()
+            try:
+                result = await loop.run_in_executor(
+                    self._executor, self.processor.process_webhook_payload, job.payload, job.delivery_id,
+                    job.received_at)
+                result['queue_seconds'] = dequeued_at - job.received_at
+                result['processing_seconds'] = time.monotonic() - dequeued_at
+                self.stats['failed' if result['status'] == 'error' else 'processed'] += 1
+                self.results.append(result)
+                if self.on_result:
+                    self.on_result(result)
+            except Exception as e:
+                self.stats['failed'] += 1
+                print(f"⚠️ Webhook job failed: {str(e)}")
+            finally:
+                self.queue.task_done()
+
+@dataclass
+class _RepositoryDocState:
+    """Pending and running documentation work for one repository"""
+    changed_files: set = field(default_factory=set)
+    head: Optional[str] = None
+    head_received_at: float = float('-inf')
+    pushes: int = 0
+    first_pending_at: Optional[float] = None
+    timer: Optional['asyncio.TimerHandle'] = None
+    running: bool = False
+
+class DocumentationJobScheduler:
+    """
+    Debounces and coalesces documentation jobs per repository.
+    
+    Each push to a repository restarts its debounce window; when the window
+    passes quietly, every push seen so far runs as one job against the head
+    of the most recently received push, with the union of their changed
+    files. Pushes are ordered by when they were received, not by when their
+    processing finishes, and a repository's latest head is remembered, so a
+    slow older push can never roll a later job back to its head. max_delay_seconds
+    caps how long a steady stream of pushes can hold a job back. At most one
+    job runs per repository; pushes arriving meanwhile are collected and run
+    as a single follow-up job once it finishes.
+    
+    schedule() may be called from any thread (e.g. WebhookProcessor running
+    on a worker pool) once start() has been awaited; the scheduling itself
+    happens on the event loop that called start().
+    """
+    
+    def __init__(self, generate: Callable[[str, str, List[str]], Dict[str, Any]],
+                 window_seconds: float = 30.0, max_delay_seconds: float = 300.0,
+                 workers: int = 2, max_results: int = 100):
+        self.generate = generate
+        self.window_seconds = window_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.workers = workers
+        self.results = deque(maxlen=max_results)
+        self.stats = {'scheduled': 0, 'coalesced': 0, 'runs': 0, 'failed': 0}
+        self._states: Dict[str, _RepositoryDocState] = {}
+        self._running_tasks = set()
+        self._loop: Optional['asyncio.AbstractEventLoop'] = None
+        self._executor: Optional['ThreadPoolExecutor'] = None
+    
+    async def start(self):
+        """Bind the scheduler to the running event loop."""
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+        
+        self._loop = asyncio.get_running_loop()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='docs')
+    
+    def schedule(self, repo_name: str, commit_hash: str, changed_files: Iterable[str],
+                 received_at: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Queue a documentation update for a push; returns immediately.
+        
+        Args:
+            repo_name: Name of the repository
+            commit_hash: Head commit of the push
+            changed_files: Files changed by the push
+            received_at: time.monotonic() when the push was received (defaults to now)
+        
+        Returns:
+            Scheduling information
+        
+        Raises:
+            RuntimeError: If start() has not been awaited yet
+        """
+        if self._loop is None:
+            raise RuntimeError("DocumentationJobScheduler.start() must be awaited before schedule()")
+        if received_at is None:
+            received_at = time.monotonic()
+        self._loop.call_soon_threadsafe(self._schedule, repo_name, commit_hash, list(changed_files), received_at)
+        return {
+            'repo_name': repo_name,
+            'commit_hash': commit_hash,
+            'status': 'scheduled',
+            'debounce_seconds': self.window_seconds
+        }
+    
+    def _schedule(self, repo_name: str, commit_hash: str, changed_files: List[str], received_at: float):
+        state = self._states.setdefault(repo_name, _RepositoryDocState())
+        self.stats['scheduled'] += 1
+        if state.pushes:
+            self.stats['coalesced'] += 1
+        state.changed_files.update(changed_files)
+        if received_at >= state.head_received_at:
+            state.head = commit_hash
+            state.head_received_at = received_at
+        state.pushes += 1
+        if state.first_pending_at is None:
+            state.first_pending_at = self._loop.time()
+        if not state.running:
+            self._arm(repo_name, state)
+    
+    def _arm(self, repo_name: str, state: _RepositoryDocState):
+        """(Re)start the debounce timer, never past the max delay."""
+        if state.timer:
+            state.timer.cancel()
+        deadline = state.first_pending_at + self.max_delay_seconds
+        delay = max(0.0, min(self.window_seconds, deadline - self._loop.time()))
+        state.timer = self._loop.call_later(delay, self._start_job, repo_name)
+    
+    def _start_job(self, repo_name: str):
+        state = self._states[repo_name]
+        state.timer = None
+        if state.running or not state.pushes:
+            return
+        head, changed_files, pushes = state.head, sorted(state.changed_files), state.pushes
+        state.changed_files = set()
+        state.pushes = 0
+        state.first_pending_at = None
+        state.running = True
+        task = self._loop.create_task(self._run_job(repo_name, head, changed_files, pushes))
+        self._running_tasks.add(task)
+        task.add_done_callback(self._running_tasks.discard)
+    
+    async def _run_job(self, repo_name: str, head: str, changed_files: List[str], pushes: int):
+        state = self._states[repo_name]
+        try:
+            result = await self._loop.run_in_executor(self._executor, self.generate, repo_name, head, changed_files)
+            result['coalesced_pushes'] = pushes
+            self.results.append(result)
+            self.stats['runs'] += 1
+        except Exception as e:
+            self.stats['failed'] += 1
+            print(f"⚠️ Documentation job for {repo_name} failed: {str(e)}")
+        finally:
+            state.running = False
+            # The state is kept (it is small) so the repository's latest head is remembered
+            if state.pushes:
+                self._arm(repo_name, state)
+    
+    def pending(self) -> Dict[str, Dict[str, Any]]:
+        """Per-repository pending pushes and whether a job is running."""
+        return {repo_name: {'pushes': state.pushes, 'head': state.head,
+                            'changed_files': len(state.changed_files), 'running': state.running}
+                for repo_name, state in self._states.items() if state.pushes or state.running}
+    
+    async def flush(self):
+        """Start every pending job now and wait until all jobs have finished."""
+        import asyncio
+        
+        # Let schedule() calls already handed to the loop land first
+        await asyncio.sleep(0)
+        while True:
+            for repo_name, state in list(self._states.items()):
+                if state.pushes and not state.running:
+                    if state.timer:
+                        state.timer.cancel()
+                    self._start_job(repo_name)
+            if not self._running_tasks:
+                break
+            await asyncio.gather(*self._running_tasks, return_exceptions=True)
+    
+    async def stop(self):
+        """Run outstanding work, then release the thread pool."""
+        await self.flush()
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
 class DocumentationGenerator:
     """
     Generates documentation using AI analysis.
@@ -158,7 +691,7 @@ class DocumentationGenerator:
         
         Args:
             file_paths: List of code file paths
-            
+        
         Returns:
             Code structure analysis
         """
@@ -201,7 +734,7 @@ class DocumentationGenerator:
         Args:
             repo_name: Repository name
             structure: Code structure analysis
-            
+        
         Returns:
             Generated README content
         """
@@ -264,8 +797,8 @@ MIT License - see LICENSE file for details
 
 # Example usage and testing
 if __name__ == "__main__":
-    # Create webhook processor
-    processor = WebhookProcessor("demo_webhook_secret")
+    # Create webhook processor; the old secret is still accepted during rotation
+    processor = WebhookProcessor(["demo_webhook_secret", "old_demo_secret"])
     
     # Example webhook payload
     example_payload = {
@@ -283,11 +816,20 @@ if __name__ == "__main__":
         ]
     }
     
+    # Verify the raw body as GitHub signs it
+    body = json.dumps(example_payload).encode('utf-8')
+    signature = SIGNATURE_PREFIX + hmac.new(b"old_demo_secret", body, hashlib.sha256).hexdigest()
+    print(f"Signature valid: {processor.verify_request(body, {'x-hub-signature-256': signature})}")
+    
     # Process the webhook
-    result = processor.process_webhook_payload(example_payload)
+    result = processor.process_webhook_payload(example_payload, delivery_id="delivery-1")
     print("Webhook Processing Result:")
     print(json.dumps(result, indent=2))
     
+    # A redelivery of the same event is skipped
+    redelivery = processor.process_webhook_payload(example_payload, delivery_id="delivery-1")
+    print(f"\nRedelivery status: {redelivery['status']}")
+    
     # Create documentation generator
     doc_gen = DocumentationGenerator()
     
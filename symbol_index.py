@@ -0,0 +1,270 @@
+"""
+Symbol Index - Persistent Cross-File Symbol Lookup for Analyzed Repositories
+This module stores the functions, classes and imports collected by
+SmartCodeAnalyzer in an indexed SQLite database, updated one file at a time,
+so lookups do not need a fresh repository scan.
+"""
+
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Iterable
+
+from smart_analyzer import ANALYZER_VERSION, export_record
+
+# Bump when SCHEMA changes; older databases are rebuilt from scratch
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    file_type TEXT,
+    mtime_ns INTEGER,
+    size_bytes INTEGER,
+    analyzer_version TEXT,
+    config_fingerprint TEXT,
+    indexed_at TEXT
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    file_path TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    parent TEXT,
+    line_number INTEGER,
+    line_count INTEGER,
+    complexity INTEGER,
+    has_docstring INTEGER
+);
+CREATE TABLE IF NOT EXISTS imports (
+    file_path TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    module TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_symbols_name ON symbols(name);
+CREATE INDEX IF NOT EXISTS idx_symbols_file ON symbols(file_path);
+CREATE INDEX IF NOT EXISTS idx_symbols_line_count ON symbols(kind, line_count);
+CREATE INDEX IF NOT EXISTS idx_symbols_complexity ON symbols(kind, complexity);
+CREATE INDEX IF NOT EXISTS idx_imports_module ON imports(module);
+CREATE INDEX IF NOT EXISTS idx_imports_file ON imports(file_path);
+"""
+
+class SymbolIndex:
+    """
+    SQLite-backed index of symbol definitions and imports.
+    
+    Each file is replaced as a unit in its own transaction, keyed by its path
+    relative to repo_path (whatever the working directory), and remembers the
+    (mtime, size) it was indexed at so unchanged files can be skipped. Rows
+    written by a different ANALYZER_VERSION or analyzer configuration
+    (fingerprint, set from SmartCodeAnalyzer.config_fingerprint) are treated
+    as stale.
+    """
+    
+    def __init__(self, db_path: str, repo_path: str = "."):
+        self.db_path = db_path
+        self.repo_path = repo_path
+        self.repo_root = os.path.abspath(repo_path)
+        self.fingerprint = ''
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(db_path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            # The index can always be rebuilt, so old layouts are simply dropped
+            self.connection.executescript(
+                "DROP TABLE IF EXISTS symbols; DROP TABLE IF EXISTS imports; DROP TABLE IF EXISTS files;"
+            )
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.connection.executescript(SCHEMA)
+    
+    def close(self):
+        """Close the database connection."""
+        self.connection.close()
+    
+    def __enter__(self) -> 'SymbolIndex':
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def relative_path(self, file_path: str) -> str:
+        """Key under which a file is indexed: its path relative to repo_path."""
+        return os.path.relpath(os.path.abspath(file_path), self.repo_root)
+    
+    def is_current(self, file_path: str) -> bool:
+        """Check whether a file is indexed at its current stat, analyzer version and configuration."""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+        row = self.connection.execute(
+            "SELECT mtime_ns, size_bytes, analyzer_version, config_fingerprint FROM files WHERE path = ?",
+            (self.relative_path(file_path),)
+        ).fetchone()
+        return (row is not None and row['mtime_ns'] == stat.st_mtime_ns
+                and row['size_bytes'] == stat.st_size and row['analyzer_version'] == ANALYZER_VERSION
+                and row['config_fingerprint'] == self.fingerprint)
+    
+    def update_file(self, file_analysis: Dict[str, Any]):
+        """
+        Replace everything indexed for one file with a fresh analysis.
+        
+        Args:
+            file_analysis: Per-file analysis from SmartCodeAnalyzer._analyze_file
+        """
+        path = self.relative_path(file_analysis['file_path'])
+        try:
+            stat = os.stat(file_analysis['file_path'])
+            mtime_ns, size_bytes = stat.st_mtime_ns, stat.st_size
+        except OSError:
+            mtime_ns, size_bytes = None, file_analysis.get('size_bytes')
+        
+        with self.connection:
+            self.connection.execute("DELETE FROM files WHERE path = ?", (path,))
+            self.connection.execute(
+                "INSERT INTO files (path, file_type, mtime_ns, size_bytes, analyzer_version, "
+                "config_fingerprint, indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, file_analysis['file_type'], mtime_ns, size_bytes, ANALYZER_VERSION,
+                 self.fingerprint, datetime.now().isoformat())
+            )
+            self.connection.executemany(
+                "INSERT INTO symbols (file_path, name, kind, parent, line_number, line_count, complexity, "
+                "has_docstring) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                self._symbol_rows(path, file_analysis)
+            )
+            self.connection.executemany(
+                "INSERT INTO imports (file_path, module) VALUES (?, ?)",
+                ((path, module) for module in set(file_analysis.get('imports', [])))
+            )
+    
+    def remove_file(self, file_path: str):
+        """Drop a file and all of its symbols and imports."""
+        with self.connection:
+            self.connection.execute("DELETE FROM files WHERE path = ?", (self.relative_path(file_path),))
+    
+    def prune(self, live_paths: Iterable[str]) -> int:
+        """
+        Remove files that are no longer part of the repository.
+        
+        Args:
+            live_paths: Paths of the repository's current code files
+        
+        Returns:
+            Number of files removed
+        """
+        live = {self.relative_path(file_path) for file_path in live_paths}
+        stale = [row['path'] for row in self.connection.execute("SELECT path FROM files")
+                 if row['path'] not in live]
+        with self.connection:
+            self.connection.executemany("DELETE FROM files WHERE path = ?", ((path,) for path in stale))
+        return len(stale)
+    
+    def sync(self, analyzer: Any) -> Dict[str, int]:
+        """
+        Bring the index up to date with its repository, re-analyzing only changed files.
+        
+        Args:
+            analyzer: SmartCodeAnalyzer used to discover and analyze files
+        
+        Returns:
+            Counts of updated, unchanged and removed files
+        """
+        self.fingerprint = analyzer.config_fingerprint()
+        code_files = analyzer._find_code_files(self.repo_path)
+        updated = unchanged = 0
+        for file_path in code_files:
+            if self.is_current(file_path):
+                unchanged += 1
+                continue
+            file_analysis = analyzer._analyze_file(file_path)
+            if file_analysis:
+                self.update_file(file_analysis)
+                updated += 1
+        removed = self.prune(code_files)
+        return {'updated': updated, 'unchanged': unchanged, 'removed': removed}
+    
+    def _symbol_rows(self, path: str, file_analysis: Dict[str, Any]):
+        """Rows for every class, method and function in one file."""
+        # Python methods also appear in the flat function list; map them to their class
+        method_parents = {}
+        for record in file_analysis.get('classes', []):
+            record = export_record(record)
+            yield (path, record['name'], 'class', None, record.get('line_number'), None, None,
+                   int(bool(record.get('has_docstring'))))
+            for method in record.get('methods', []):
+                method_parents[export_record(method)['line_number']] = record['name']
+        
+        for record in file_analysis.get('functions', []):
+            record = export_record(record)
+            parent = method_parents.get(record.get('line_number'))
+            kind = 'method' if parent or record.get('type') == 'method' else 'function'
+            yield (path, record['name'], kind, parent, record.get('line_number'),
+                   record.get('line_count'), record.get('complexity'),
+                   int(bool(record.get('has_docstring'))))
+    
+    def find_definitions(self, name: str, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Find where a name is defined.
+        
+        Args:
+            name: Function, method or class name
+            kind: Optional filter: 'function', 'method' or 'class'
+        """
+        query = "SELECT * FROM symbols WHERE name = ?"
+        params = [name]
+        if kind:
+            query += " AND kind = ?"
+            params.append(kind)
+        query += " ORDER BY file_path, line_number"
+        return [dict(row) for row in self.connection.execute(query, params)]
+    
+    def find_importers(self, module: str) -> List[Dict[str, Any]]:
+        """
+        Find files importing a module or anything inside it.
+        
+        'os' matches imports of 'os' and 'os.path' but not 'osx'. The prefix
+        test is written as a range so it is answered from the module index.
+        """
+        rows = self.connection.execute(
+            "SELECT DISTINCT file_path, module FROM imports "
+            "WHERE module = ? OR (module >= ? AND module < ?) ORDER BY file_path, module",
+            (module, f"{module}.", f"{module}/")
+        )
+        return [dict(row) for row in rows]
+    
+    def largest_functions(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Functions and methods with the most lines."""
+        return self._top_functions('line_count', limit)
+    
+    def most_complex_functions(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Functions and methods with the highest cyclomatic complexity."""
+        return self._top_functions('complexity', limit)
+    
+    def _top_functions(self, column: str, limit: int) -> List[Dict[str, Any]]:
+        rows = self.connection.execute(
+            f"SELECT * FROM symbols WHERE kind IN ('function', 'method') AND {column} IS NOT NULL "
+            f"ORDER BY {column} DESC, file_path, line_number LIMIT ?",
+            (limit,)
+        )
+        return [dict(row) for row in rows]
+    
+    def stats(self) -> Dict[str, int]:
+        """Number of indexed files, symbols and imports."""
+        return {
+            'files': self.connection.execute("SELECT COUNT(*) FROM files").fetchone()[0],
+            'symbols': self.connection.execute("SELECT COUNT(*) FROM symbols").fetchone()[0],
+            'imports': self.connection.execute("SELECT COUNT(*) FROM imports").fetchone()[0]
+        }
+
+if __name__ == "__main__":
+    import sys
+    from smart_analyzer import SmartCodeAnalyzer
+    
+    repo_path = sys.argv[1] if len(sys.argv) > 1 else "."
+    with SymbolIndex(os.path.join(repo_path, ".smart_analyzer", "symbols.db"), repo_path) as index:
+        print(f"🗂️ Syncing symbol index: {index.sync(SmartCodeAnalyzer())}")
+        print(f"📊 Indexed: {index.stats()}")
+        print("🧮 Most complex functions:")
+        for symbol in index.most_complex_functions(5):
+            print(f"  {symbol['file_path']}:{symbol['line_number']} {symbol['name']} (complexity {symbol['complexity']})")
@@ -0,0 +1,88 @@
+"""
+Tests for InsightEngine against a local stub model.
+"""
+
+import asyncio
+import threading
+import time
+
+from ai_insights import InsightEngine
+
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+class StubModel:
+    """Answers instantly, except prompts mentioning a directory listed in hang or fail."""
+    
+    def __init__(self, hang=(), fail=()):
+        self.hang = hang
+        self.fail = fail
+        self.release = threading.Event()
+    
+    def generate_content(self, prompt):
+        if any(f"`{directory}`" in prompt for directory in self.hang):
+            self.release.wait(5)
+        if any(f"`{directory}`" in prompt for directory in self.fail):
+            raise RuntimeError("model unavailable")
+        return StubResponse('{"ok": true}')
+
+def _results(directories):
+    return {
+        'files_analyzed': sum(stats['files'] for stats in directories.values()),
+        'file_types': {'.py': 1},
+        'functions': [],
+        'classes': [],
+        'security_issues': [],
+        'directories': directories
+    }
+
+def test_timed_out_call_does_not_block_other_prompts():
+    """An abandoned call keeps its thread, but later prompts still get answers."""
+    model = StubModel(hang=['slow'], fail=['broken'])
+    engine = InsightEngine(model=model, max_concurrency=1, call_timeout=0.3, deadline=None)
+    results = _results({'slow': {'files': 9}, 'fast': {'files': 5}, 'broken': {'files': 1}})
+    try:
+        insights = engine.generate(results)
+        assert insights['ai_insights'] == '{"ok": true}'
+        outcomes = insights['directory_insights']
+        assert outcomes['slow']['status'] == 'timeout'
+        assert outcomes['fast']['status'] == 'success'
+        assert outcomes['broken']['status'] == 'error'
+        
+        # The hung thread is still busy; the next run must not queue behind it
+        again = engine.generate(_results({'fast': {'files': 5}}))
+        assert again is not None
+        assert again['directory_insights']['fast']['status'] == 'success'
+    finally:
+        model.release.set()
+
+def test_generate_inside_running_event_loop():
+    """The synchronous wrapper also works when an event loop is already running."""
+    engine = InsightEngine(model=StubModel(), call_timeout=1.0)
+    
+    async def handler():
+        return engine.generate(_results({'src': {'files': 2}}))
+    
+    insights = asyncio.run(handler())
+    assert insights['directory_insights']['src']['status'] == 'success'
+
+def test_abandoned_calls_are_capped():
+    """Once max_abandoned_calls hung threads are outstanding, calls fail fast instead of starting threads."""
+    model = StubModel(hang=['slow', 'slower'])
+    engine = InsightEngine(model=model, max_concurrency=1, call_timeout=0.3, deadline=None, max_abandoned_calls=1)
+    try:
+        outcomes = engine.generate(_results({'slow': {'files': 9}, 'slower': {'files': 7},
+                                             'fast': {'files': 5}}))['directory_insights']
+        assert outcomes['slow']['status'] == 'timeout'
+        assert outcomes['slower']['status'] == 'error'
+        assert outcomes['fast']['status'] == 'error'
+        assert sum(thread.name.startswith('insights') for thread in threading.enumerate()) <= 2
+    finally:
+        model.release.set()
+    
+    deadline = time.monotonic() + 5
+    while engine._abandoned and time.monotonic() < deadline:
+        time.sleep(0.01)
+    again = engine.generate(_results({'fast': {'files': 5}}))
+    assert again['directory_insights']['fast']['status'] == 'success'
@@ -0,0 +1,43 @@
+"""
+Tests for CloneDetector.
+"""
+
+from clone_detector import CloneDetector
+
+BLOCK = """
+def load(path, retries):
+    total = 0
+    for attempt in range(retries):
+        try:
+            with open(path) as handle:
+                total += len(handle.read())
+        except OSError as error:
+            print("retry", attempt, error)
+    return total
+"""
+
+def _function(name, line_count):
+    return {'name': name, 'line_number': 1, 'line_count': line_count}
+
+def test_functions_match_only_identical_bodies():
+    """Renamed copies match; a body of the same length with other tokens does not."""
+    detector = CloneDetector()
+    detector.add_file("a.py", "def add(a, b):\n    total = a + b\n    return total\n", '.py', [_function('add', 3)])
+    detector.add_file("b.py", "def plus(x, y):\n    result = x + y\n    return result\n", '.py', [_function('plus', 3)])
+    detector.add_file("c.py", "def sub(a, b):\n    total = a - b\n    return total\n", '.py', [_function('sub', 3)])
+    
+    groups = [group for group in detector.clone_groups() if group['kind'] == 'function']
+    assert len(groups) == 1
+    assert [location['name'] for location in groups[0]['locations']] == ['add', 'plus']
+
+def test_block_copied_into_three_files_is_one_group():
+    """Every copy of a block lands in one group, whatever the pair window."""
+    for pair_window in (1, 16):
+        detector = CloneDetector(pair_window=pair_window)
+        for name in ("a.py", "b.py", "c.py"):
+            detector.add_file(name, "import os\n" + BLOCK, '.py')
+        
+        groups = detector.clone_groups()
+        assert len(groups) == 1
+        assert groups[0]['kind'] == 'block'
+        assert [location['file_path'] for location in groups[0]['locations']] == ["a.py", "b.py", "c.py"]
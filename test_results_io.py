@@ -0,0 +1,55 @@
+"""
+Round-trip tests for the results writers and the binary archive.
+"""
+
+import io
+import json
+
+import pytest
+
+from results_io import ResultsArchive, read_jsonl, write_json, write_jsonl, write_results_archive
+
+RESULTS = {
+    'repository_path': '/repo',
+    'files_analyzed': 3,
+    'file_types': {'.py': 2, '.js': 1},
+    'functions': [{'name': f"func_{i}", 'line_number': i, 'file_path': 'pkg/módulo.py'} for i in range(7)],
+    'classes': [],
+    'security_issues': [{'issue': 'Use of eval() function', 'severity': 'high', 'line_number': 4}]
+}
+
+def test_archive_round_trips_and_reads_sections_lazily(tmp_path):
+    """load() returns the input; counts come from the table of contents and records stream across chunks."""
+    path = str(tmp_path / "results.scarch")
+    toc = write_results_archive(RESULTS, path, chunk_records=3)
+    assert len(toc['sections']['functions']['chunks']) == 3
+    
+    with ResultsArchive(path) as archive:
+        assert archive.keys() == list(RESULTS)
+        assert archive.count('functions') == 7
+        assert archive.count('classes') == 0
+        assert archive._loaded == {}
+        assert [record['name'] for record in archive.iter_records('functions')] == [f"func_{i}" for i in range(7)]
+        assert 'functions' not in archive._loaded
+        assert archive.get('missing', 'default') == 'default'
+        assert archive.load() == RESULTS
+
+def test_non_archive_files_raise_value_error(tmp_path):
+    """Files without the archive magic, including ones shorter than the trailer, are rejected."""
+    for name, data in (("short.json", b"{}"), ("results.json", json.dumps(RESULTS).encode('utf-8'))):
+        path = tmp_path / name
+        path.write_bytes(data)
+        with pytest.raises(ValueError):
+            ResultsArchive(str(path))
+
+def test_json_and_jsonl_writers_round_trip():
+    """write_json matches json.dumps, and read_jsonl rebuilds what write_jsonl wrote, empty lists included."""
+    buffer = io.StringIO()
+    write_json(RESULTS, buffer)
+    assert json.loads(buffer.getvalue()) == RESULTS
+    
+    buffer = io.StringIO()
+    write_jsonl(RESULTS, buffer)
+    lines = buffer.getvalue().splitlines()
+    assert len(lines) == 1 + 7 + 1
+    assert read_jsonl(io.StringIO(buffer.getvalue())) == RESULTS
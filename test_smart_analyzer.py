@@ -0,0 +1,225 @@
+"""
+Behavioral tests for SmartCodeAnalyzer and its helpers.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from smart_analyzer import SmartCodeAnalyzer, SecurityScanner, _to_jsonable
+
+SAMPLE_MODULE = '''"""Sample module."""
+
+def add(a, b):
+    """Add two numbers."""
+    return a + b
+
+class Greeter:
+    def greet(self, name):
+        if name:
+            return "hi " + name
+        return "hi"
+'''
+
+def _write(root, relative_path, content):
+    path = os.path.join(root, *relative_path.split('/'))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return path
+
+def _git(repo, *args):
+    subprocess.run(['git', '-C', repo, '-c', 'user.name=Test', '-c', 'user.email=test@example.com', *args],
+                   check=True, capture_output=True)
+
+def _commit_all(repo, message):
+    _git(repo, 'add', '-A')
+    _git(repo, 'commit', '-q', '-m', message)
+
+def _comparable(results):
+    """Results as JSON, without the fields that legitimately differ between runs."""
+    results = dict(results)
+    results.pop('analysis_timestamp', None)
+    results.pop('profiling', None)
+    return json.dumps(results, default=_to_jsonable, sort_keys=True)
+
+def test_parallel_results_match_serial(tmp_path):
+    """A process pool produces exactly the serial results, in the same order."""
+    repo = str(tmp_path / "repo")
+    _write(repo, "pkg/sample.py", SAMPLE_MODULE)
+    _write(repo, "pkg/unsafe.py", "import pickle\n\ndef load(data):\n    return eval(data)\n")
+    _write(repo, "pkg/broken.py", "def broken(:\n")
+    _write(repo, "web/app.js", "import x from 'x';\nclass App {}\nfunction run(a) { if (a) { eval(a); } }\n")
+    _write(repo, "web/index.html", "<html><script>alert(1)</script></html>\n")
+    _write(repo, "web/style.css", ".a { color: red; }\n")
+    _write(repo, "src/Main.java", "import java.util.List;\npublic class Main {\n    public void run() {}\n}\n")
+    
+    analyzer = SmartCodeAnalyzer()
+    serial = analyzer.analyze_repository(repo, workers=1)
+    parallel = analyzer.analyze_repository(repo, workers=2)
+    
+    assert serial['files_analyzed'] == 7
+    assert _comparable(parallel) == _comparable(serial)
+
+def test_cache_is_invalidated_by_size_policy(tmp_path):
+    """Results cached under one size limit are not served under another."""
+    repo = str(tmp_path / "repo")
+    _write(repo, "sample.py", SAMPLE_MODULE)
+    cache_path = str(tmp_path / "cache.json")
+    
+    limited = SmartCodeAnalyzer(cache_path=cache_path, max_file_bytes=10).analyze_repository(repo)
+    assert limited['summary']['total_degraded_files'] == 1
+    assert limited['functions'] == []
+    
+    full = SmartCodeAnalyzer(cache_path=cache_path).analyze_repository(repo)
+    assert full['summary']['total_degraded_files'] == 0
+    assert {func['name'] for func in full['functions']} == {'add', 'greet'}
+    assert full['cache_stats']['hits'] == 0
+    
+    again = SmartCodeAnalyzer(cache_path=cache_path).analyze_repository(repo)
+    assert again['cache_stats']['hits'] == 1
+    assert again['functions'] == full['functions']
+
+def test_cache_keeps_identical_content_apart_by_extension(tmp_path):
+    """The same bytes under another extension are analyzed by their own language, cold or warm."""
+    repo = str(tmp_path / "repo")
+    source = "function add(a, b) { return a + b; }\n"
+    _write(repo, "pkg/__init__.py", "")
+    _write(repo, "pkg/style.css", "")
+    _write(repo, "pkg/a.py", source)
+    _write(repo, "pkg/b.js", source)
+    cache_path = str(tmp_path / "cache.json")
+    
+    cold = SmartCodeAnalyzer(cache_path=cache_path).analyze_repository(repo)
+    warm = SmartCodeAnalyzer(cache_path=cache_path).analyze_repository(repo)
+    
+    assert cold['cache_stats']['misses'] == 4
+    assert warm['cache_stats']['hits'] == 4
+    assert warm['file_types'] == cold['file_types'] == {'.py': 2, '.css': 1, '.js': 1}
+    assert warm['functions'] == cold['functions']
+    assert [func['name'] for func in warm['functions']] == ['add']
+
+def test_walker_prunes_excluded_directories_and_applies_gitignore(tmp_path, monkeypatch):
+    """Excluded directories are never entered, and .gitignore rules match like git's for the supported subset."""
+    repo = str(tmp_path / "repo")
+    for relative_path in ("src/rebuild_utils.py", "src/top.py", "top.py", "build/gen.py", "node_modules/dep.js",
+                          "scratch/notes.py", "src/scratch_notes.py", "src/tests/fixtures/case.py",
+                          "docs/conf.py", "docs/api/ref.py", "web/app.min.js", "web/vendor.min.js"):
+        _write(repo, relative_path, "x = 1\n")
+    _write(repo, ".gitignore", "# generated\nscratch*/\n/top.py\n**/fixtures\n*.min.js\n!vendor.min.js\n")
+    
+    scanned = []
+    real_scandir = os.scandir
+    def recording_scandir(path):
+        scanned.append(os.path.relpath(path, repo))
+        return real_scandir(path)
+    monkeypatch.setattr(os, 'scandir', recording_scandir)
+    
+    analyzer = SmartCodeAnalyzer(exclude_patterns=["docs/*.py"], use_gitignore=True)
+    found = [os.path.relpath(path, repo).replace(os.sep, '/') for path in analyzer._find_code_files(repo)]
+    
+    assert found == ["docs/api/ref.py", "src/rebuild_utils.py", "src/scratch_notes.py", "src/top.py"]
+    assert not {'build', 'node_modules', 'scratch', os.path.join('src', 'tests', 'fixtures')} & set(scanned)
+
+def test_security_scanner_reports_overlapping_rules():
+    """Rules matching at the same position each report their own hit."""
+    scanner = SecurityScanner({
+        r'eval\s*\(': {'severity': 'high', 'issue': 'Use of eval() function'},
+        r'eval\(request': {'severity': 'high', 'issue': 'eval() of request data'},
+        r'\bexec\b': {'severity': 'high', 'issue': 'Use of exec'}
+    })
+    issues = scanner.scan("x = 1\ny = eval(request.body)\nEXEC(y)\n")
+    
+    assert [(issue['issue'], issue['line_number'], issue['column']) for issue in issues] == [
+        ('Use of eval() function', 2, 5),
+        ('eval() of request data', 2, 5),
+        ('Use of exec', 3, 1)
+    ]
+    assert scanner.scan("print('safe')\n") == []
+
+def test_chunked_metrics_cut_long_lines(tmp_path):
+    """A line longer than a chunk is cut mid-line but still counted once, like the whole-file metrics."""
+    minified = "".join(f"function f{i}(a){{if(a){{return a}}for(;;){{}}}}" for i in range(200))
+    indented = " " * 600 + "var y = 2;"
+    content = "// header\n\n" + minified + "\n" + indented + "\nvar x = 1;\n"
+    path = _write(str(tmp_path), "bundle.min.js", content)
+    analyzer = SmartCodeAnalyzer()
+    
+    whole = analyzer._calculate_chunked_metrics(path)
+    chunked = analyzer._calculate_chunked_metrics(path, chunk_size=256)
+    
+    assert chunked == whole == analyzer._calculate_basic_metrics(content)
+    assert (whole.total_lines, whole.blank_lines, whole.comment_lines, whole.code_lines) == (5, 1, 1, 3)
+
+def test_complexity_counts_whole_keywords_on_code_lines():
+    """Identifiers containing a keyword, and keywords in comment lines, are not complexity."""
+    analyzer = SmartCodeAnalyzer()
+    
+    assert analyzer._calculate_basic_metrics("x = diff\ny = format(a)\n").complexity_score == 0
+    branches = "if a:\n    pass\nelif b:\n    pass\nelse:\n    pass\n# for each retry\n"
+    assert analyzer._calculate_basic_metrics(branches).complexity_score == 3
+
+def test_degraded_mode_is_opt_in(tmp_path):
+    """Without size limits even a large file gets the full analysis."""
+    content = SAMPLE_MODULE + "".join(f"value_{i} = {i}\n" for i in range(20000))
+    path = _write(str(tmp_path), "big.py", content)
+    analyzer = SmartCodeAnalyzer()
+    
+    assert (analyzer.large_file_bytes, analyzer.max_file_bytes) == (None, None)
+    analysis = analyzer._analyze_file(path)
+    assert analysis['degraded'] is None
+    assert [func['name'] for func in analysis['functions']] == ['add', 'greet']
+    
+    limited = SmartCodeAnalyzer(large_file_bytes=len(SAMPLE_MODULE))._analyze_file(path)
+    assert limited['degraded'] == 'metrics_only'
+    assert limited['functions'] == []
+
+def test_import_defers_optional_dependencies():
+    """The process pool, git and mmap helpers are imported only by the code paths that use them."""
+    check = ("import sys, smart_analyzer; print(sorted({'concurrent.futures', 'subprocess', 'tempfile', 'mmap', "
+             "'import_graph'} & set(sys.modules)))")
+    completed = subprocess.run([sys.executable, '-c', check], capture_output=True, text=True, check=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert completed.stdout.strip() == '[]'
+
+def test_analyze_changes_between_revisions(tmp_path):
+    """Only files changed since the baseline are analyzed and merged into the report."""
+    repo = str(tmp_path / "repo")
+    os.makedirs(repo)
+    _git(repo, 'init', '-q')
+    _write(repo, "core.py", "def core():\n    return 1\n")
+    _write(repo, "app.py", "import core\n\ndef main():\n    return core.core()\n")
+    _write(repo, "old.py", "def old():\n    pass\n")
+    _write(repo, "dir with space/my module.py", "def spaced():\n    pass\n")
+    _write(repo, "node_modules/vendor.py", "def vendored():\n    pass\n")
+    _commit_all(repo, "initial")
+    
+    analyzer = SmartCodeAnalyzer()
+    baseline_path = str(tmp_path / "baseline.json")
+    first = analyzer.analyze_changes(repo, baseline_path)
+    assert first['delta']['base_revision'] is None
+    assert sorted(first['delta']['added']) == ['app.py', 'core.py', 'dir with space/my module.py', 'old.py']
+    
+    _write(repo, "core.py", "def core():\n    return 2\n\ndef helper():\n    pass\n")
+    _write(repo, "dir with space/new file.py", "class Fresh:\n    pass\n")
+    _write(repo, "node_modules/other.py", "def ignored():\n    pass\n")
+    os.remove(os.path.join(repo, "old.py"))
+    _commit_all(repo, "change")
+    
+    second = analyzer.analyze_changes(repo, baseline_path)
+    delta = second['delta']
+    assert delta['base_revision'] == first['delta']['head_revision']
+    assert delta['added'] == ['dir with space/new file.py']
+    assert delta['modified'] == ['core.py']
+    assert delta['removed'] == ['old.py']
+    assert delta['affected'] == ['app.py', 'core.py', 'dir with space/new file.py']
+    assert delta['summary_change'] == {'functions': 0, 'classes': 1, 'security_issues': 0}
+    
+    report = second['report']
+    assert report['total_files'] == 4
+    assert sorted(func['name'] for func in report['functions']) == ['core', 'helper', 'main', 'spaced']
+    assert [cls['name'] for cls in report['classes']] == ['Fresh']
+    
+    unchanged = analyzer.analyze_changes(repo, baseline_path)['delta']
+    assert (unchanged['added'], unchanged['modified'], unchanged['removed']) == ([], [], [])
@@ -0,0 +1,171 @@
+"""
+Behavioral tests for the webhook processing pipeline.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import os
+import subprocess
+import sys
+
+import pytest
+
+import smart_webhook_feature
+from smart_webhook_feature import (DedupStore, DocumentationJobScheduler, PushChangeSet, WebhookIngestionQueue,
+                                   WebhookProcessor)
+
+def _push(after, *commits, full_name="octo/repo"):
+    return {
+        'repository': {'name': full_name.split('/')[-1], 'full_name': full_name},
+        'after': after,
+        'commits': list(commits)
+    }
+
+def _sign(secret, body):
+    return "sha256=" + hmac.new(secret, body, hashlib.sha256).hexdigest()
+
+def _commit(added=(), modified=(), removed=()):
+    return {'id': 'c', 'added': list(added), 'modified': list(modified), 'removed': list(removed)}
+
+def test_dedup_store_evicts_least_recently_seen_and_expired_keys(monkeypatch):
+    """Keys leave the store by LRU order once full, and after their TTL."""
+    now = [1000.0]
+    monkeypatch.setattr(smart_webhook_feature.time, 'monotonic', lambda: now[0])
+    store = DedupStore(max_entries=2, ttl_seconds=60)
+    
+    assert store.add_if_absent('a')
+    assert store.add_if_absent('b')
+    assert not store.add_if_absent('a')  # refreshes 'a'
+    assert store.add_if_absent('c')      # evicts 'b'
+    assert 'a' in store and 'c' in store and 'b' not in store
+    assert len(store) == 2
+    
+    now[0] += 61
+    assert 'a' not in store
+    assert len(store) == 0
+
+def test_redelivered_push_is_processed_once():
+    """A redelivery or another delivery of the same commit is a duplicate; a failed one can be retried."""
+    processor = WebhookProcessor("secret")
+    payload = _push("abc123", _commit(modified=["app.py"]))
+    
+    assert processor.process_webhook_payload(payload, "delivery-1")['status'] == 'success'
+    assert processor.process_webhook_payload(payload, "delivery-1")['status'] == 'duplicate'
+    assert processor.process_webhook_payload(payload, "delivery-2")['status'] == 'duplicate'
+    assert processor.process_webhook_payload(_push("def456", _commit(modified=["app.py"])),
+                                             "delivery-3")['status'] == 'success'
+    assert len(processor.processed_commits) == 2
+    
+    def fail(*args, **kwargs):
+        raise RuntimeError("generator down")
+    
+    processor.generate_documentation_update = fail
+    retried = _push("789fed", _commit(added=["new.py"]))
+    assert processor.process_webhook_payload(retried, "delivery-4")['status'] == 'error'
+    del processor.generate_documentation_update
+    assert processor.process_webhook_payload(retried, "delivery-4")['status'] == 'success'
+
+def test_signature_verification_accepts_rotated_secrets():
+    """Either secret verifies while rotating; the old one stops once it is dropped."""
+    body = b'{"after": "abc123"}'
+    processor = WebhookProcessor(["new-secret", b"old-secret"])
+    
+    assert processor.verify_webhook_signature(body, _sign(b"new-secret", body))
+    assert processor.verify_webhook_signature(body.decode('utf-8'), _sign(b"old-secret", body))
+    assert processor.verify_request(body, {'x-hub-signature-256': _sign(b"old-secret", body)})
+    assert not processor.verify_webhook_signature(body, _sign(b"other", body))
+    assert not processor.verify_webhook_signature(body + b" ", _sign(b"new-secret", body))
+    assert not processor.verify_webhook_signature(body, "sha256=not-hex")
+    assert not processor.verify_webhook_signature(body, _sign(b"new-secret", body)[len("sha256="):])
+    assert not processor.verify_request(body, {})
+    
+    processor.set_webhook_secrets("new-secret")
+    assert processor.verify_webhook_signature(body, _sign(b"new-secret", body))
+    assert not processor.verify_webhook_signature(body, _sign(b"old-secret", body))
+    with pytest.raises(ValueError):
+        processor.set_webhook_secrets([])
+
+def test_push_change_set_folds_commits_into_net_changes():
+    """Later commits cancel or upgrade earlier changes to the same path."""
+    change_set = PushChangeSet([
+        _commit(added=["tmp.py", "new.py", "notes.txt"], removed=["gone.py"]),
+        _commit(modified=["new.py", "app.py"], added=["gone.py"]),
+        _commit(removed=["tmp.py"])
+    ])
+    
+    assert change_set.commit_count == 3
+    assert sorted(change_set.added) == ["new.py", "notes.txt"]
+    assert sorted(change_set.modified) == ["app.py", "gone.py"]
+    assert change_set.removed == []
+    assert len(change_set) == 4
+    assert change_set.relevant() == {'added': ["new.py"], 'modified': ["gone.py", "app.py"], 'removed': []}
+
+def test_push_triggers_update_for_changes_outside_the_head_commit():
+    """Every commit of a push counts, not just the head commit."""
+    processor = WebhookProcessor("secret")
+    result = processor.process_webhook_payload(_push(
+        "abc123",
+        _commit(modified=["src/core.py"]),
+        _commit(added=["CHANGELOG.txt"])
+    ))
+    
+    assert result['analysis']['relevant_files'] == ["src/core.py"]
+    assert result['analysis']['commit_count'] == 2
+    assert result['documentation_update']['source_files'] == ["src/core.py"]
+
+def test_scheduler_runs_against_most_recently_received_head():
+    """Heads are ordered by receipt, so a slow older push cannot roll a job back."""
+    calls = []
+    
+    def generate(repo_name, head, changed_files):
+        calls.append((repo_name, head, changed_files))
+        return {'head': head}
+    
+    scheduler = DocumentationJobScheduler(generate, window_seconds=60)
+    with pytest.raises(RuntimeError):
+        scheduler.schedule('repo', 'abc', ['a.py'])
+    
+    async def run():
+        await scheduler.start()
+        # The newer push finishes processing first
+        scheduler.schedule('repo', 'new', ['b.py'], received_at=2.0)
+        scheduler.schedule('repo', 'old', ['a.py'], received_at=1.0)
+        await scheduler.flush()
+        scheduler.schedule('repo', 'older', ['c.py'], received_at=0.5)
+        await scheduler.stop()
+    
+    asyncio.run(run())
+    assert calls == [('repo', 'new', ['a.py', 'b.py']), ('repo', 'new', ['c.py'])]
+    assert scheduler.stats == {'scheduled': 3, 'coalesced': 1, 'runs': 2, 'failed': 0}
+    assert scheduler.pending() == {}
+
+def test_ingestion_queue_acknowledges_pushes_back_and_drains():
+    """202 while there is room, 429 when full, 503 outside start()/stop(); stop() finishes queued jobs."""
+    queue = WebhookIngestionQueue(WebhookProcessor("secret"), workers=1, max_queue_size=2)
+    payloads = [_push(f"head{i}", _commit(modified=["app.py"])) for i in range(4)]
+    
+    async def run():
+        before = queue.submit(payloads[0], "delivery-0")
+        await queue.start()
+        # No await between submits, so the worker cannot dequeue in between
+        during = [queue.submit(payload, f"delivery-{i}") for i, payload in enumerate(payloads)]
+        await queue.stop()
+        after = queue.submit(payloads[0], "delivery-9")
+        return before, during, after
+    
+    before, during, after = asyncio.run(run())
+    assert before['status_code'] == after['status_code'] == 503
+    assert [response['status_code'] for response in during] == [202, 202, 429, 429]
+    assert during[2]['headers'] == {'Retry-After': '30'}
+    assert queue.stats == {'accepted': 2, 'rejected_full': 2, 'rejected_unavailable': 2,
+                           'duplicates': 0, 'processed': 2, 'failed': 0}
+    assert [result['status'] for result in queue.results] == ['success', 'success']
+    assert all(result['queue_seconds'] >= 0 and result['processing_seconds'] >= 0 for result in queue.results)
+
+def test_import_does_not_load_asyncio():
+    """asyncio and the thread pool are only imported once a queue or scheduler starts."""
+    check = "import sys, smart_webhook_feature; print(sorted({'asyncio', 'concurrent.futures'} & set(sys.modules)))"
+    completed = subprocess.run([sys.executable, '-c', check], capture_output=True, text=True, check=True,
+                               cwd=os.path.dirname(os.path.abspath(smart_webhook_feature.__file__)))
+    assert completed.stdout.strip() == '[]'
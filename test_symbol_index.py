@@ -0,0 +1,49 @@
+"""
+Tests for the persistent SymbolIndex.
+"""
+
+import os
+
+from smart_analyzer import SmartCodeAnalyzer
+from symbol_index import SymbolIndex
+
+def _write(root, relative_path, content):
+    path = os.path.join(root, *relative_path.split('/'))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return path
+
+def test_sync_keys_files_by_repository_path(tmp_path, monkeypatch):
+    """The same repository synced from another working directory is already current."""
+    repo = tmp_path / "repo"
+    _write(str(repo), "pkg/core.py", "def core():\n    return 1\n")
+    _write(str(repo), "app.py", "import pkg.core\n\nclass App:\n    pass\n")
+    db_path = str(tmp_path / "symbols.db")
+    
+    monkeypatch.chdir(tmp_path)
+    with SymbolIndex(db_path, "repo") as index:
+        assert index.sync(SmartCodeAnalyzer()) == {'updated': 2, 'unchanged': 0, 'removed': 0}
+    
+    monkeypatch.chdir(repo / "pkg")
+    with SymbolIndex(db_path, "..") as index:
+        assert index.sync(SmartCodeAnalyzer()) == {'updated': 0, 'unchanged': 2, 'removed': 0}
+        assert [row['file_path'] for row in index.find_definitions('core')] == [os.path.join('pkg', 'core.py')]
+        assert [row['file_path'] for row in index.find_importers('pkg')] == ['app.py']
+        
+        os.remove("core.py")
+        assert index.sync(SmartCodeAnalyzer()) == {'updated': 0, 'unchanged': 1, 'removed': 1}
+        assert index.find_definitions('core') == []
+
+def test_config_change_reindexes_files(tmp_path):
+    """Rows written under other analyzer settings are not current."""
+    repo = str(tmp_path / "repo")
+    _write(repo, "core.py", "def core():\n    return 1\n")
+    
+    with SymbolIndex(str(tmp_path / "symbols.db"), repo) as index:
+        assert index.sync(SmartCodeAnalyzer(max_file_bytes=10))['updated'] == 1
+        assert index.find_definitions('core') == []
+        
+        assert index.sync(SmartCodeAnalyzer())['updated'] == 1
+        assert len(index.find_definitions('core')) == 1
+        assert index.sync(SmartCodeAnalyzer())['unchanged'] == 1